@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_reorder.py
+
+times the effect of reorder.reorder_mesh on the next operator in a chain,
+on approximate canonize solves and on symmetric canonize iterations, with
+and without renumbering
+
+python bench_reorder.py [notation] [seed] [repeats]
+
+uses standalaone version of mathutils
+https://github.com/majimboo/py-mathutils
+"""
+import sys
+import time
+
+import canon_approx
+import notation
+import reorder
+import symmetry
+from seeds import source as solid
+
+
+def best_time(fn, repeats):
+    """
+    shortest time of repeats calls to fn
+    """
+    best = float('inf')
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(chain='ggk', seed='6', repeats=3):
+    verts, faces = notation.apply_notation(chain, *solid(seed))
+    group = symmetry.symmetry_group(*solid(seed))
+    print('{} on seed {}: {} verts, {} faces'.format(chain, seed, len(verts),
+                                                     len(faces)))
+    meshes = [('as built', verts, faces)]
+    for method in reorder.ORDERS:
+        start = time.perf_counter()
+        verts_r, faces_r = reorder.reorder_mesh(verts, faces, method)[:2]
+        cost = time.perf_counter() - start
+        meshes.append(('{} ({:.3f}s)'.format(method, cost), verts_r, faces_r))
+
+    print('{:<20} {:>10} {:>10} {:>12} {:>12}'.format('order', 'kis', 'ambo',
+                                                      'canon x10',
+                                                      'sym x10'))
+    for name, verts_m, faces_m in meshes:
+        t_kis = best_time(lambda: notation.apply_notation('k', verts_m, faces_m),
+                          repeats)
+        t_ambo = best_time(lambda: notation.apply_notation('a', verts_m, faces_m),
+                           repeats)
+        t_canon = best_time(lambda: canon_approx.approx_canonize(
+            verts_m, faces_m, solves=10, tol=0), repeats)
+        t_sym = best_time(lambda: symmetry.canonize_symmetric(
+            verts_m, faces_m, group, 10, 0.1), repeats)
+        print('{:<20} {:>10.4f} {:>10.4f} {:>12.4f} {:>12.4f}'.format(
+            name, t_kis, t_ambo, t_canon, t_sym))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*args[:2], *[int(a) for a in args[2:3]])
@@ -0,0 +1,254 @@
+"""
+fast approximate canonicalization of polyhedra using numpy
+
+canon.py moves the verts a small step at a time, one edge and one face at a
+time, and can take several hundred iterations.  For large meshes this is
+too slow.  Here canonical form is posed as a sparse nonlinear least-squares
+problem over all the vertex positions and face planes at once, with one
+residual for each edge (distance of the edge from the origin minus 1), one
+for each corner (the vert is on its face plane) and three for the center of
+the tangent points.
+
+Each solve is a damped Gauss-Newton (Levenberg-Marquardt) step: the linear
+system (J^T J + lambda I) dx = -J^T r is solved by Jacobi preconditioned
+conjugate gradients, with the sparse Jacobian J applied through numpy
+bincount over the half-edge arrays, so nothing bigger than the mesh is ever
+built.  A step is only kept if it lowers the sum of squared residuals,
+otherwise it is shortened or the damping is raised.  The verts returned are
+the ones with the smallest largest residual seen, so more solves never give
+a worse result.
+
+A handful of solves gives a shape good enough for display, or a warm start
+for canon.canonize.  The residuals are returned so the caller can decide
+whether the approximation is good enough.
+"""
+import numpy as np
+from mesh import mesh_arrays
+
+
+def _tangent_points(verts, edges):
+    """
+    closest point to the origin on the line through each edge
+    """
+    v1_xyz = verts[edges[:, 0]]
+    d_xyz = verts[edges[:, 1]] - v1_xyz
+    s = -np.einsum('ij,ij->i', v1_xyz, d_xyz) / np.einsum('ij,ij->i', d_xyz, d_xyz)
+    return v1_xyz + s[:, None] * d_xyz
+
+
+def _face_planes(verts, corner_face, corner_vert, corner_next, nfaces):
+    """
+    centroid and unit Newell normal of each face
+    """
+    counts = np.bincount(corner_face, minlength=nfaces)[:, None]
+    centers = np.stack([np.bincount(corner_face, verts[corner_vert, i],
+                                    minlength=nfaces) for i in range(3)],
+                       axis=1) / counts
+    cross = np.cross(verts[corner_vert], verts[corner_next])
+    norms = np.stack([np.bincount(corner_face, cross[:, i], minlength=nfaces)
+                      for i in range(3)], axis=1)
+    norms /= np.linalg.norm(norms, axis=1)[:, None]
+    return centers, norms
+
+
+def _scatter(index, values, nverts):
+    """
+    sum of the rows of values that belong to each vert
+    """
+    return np.stack([np.bincount(index, values[:, i], minlength=nverts)
+                     for i in range(3)], axis=1)
+
+
+def residuals(verts, faces):
+    """
+    how far a mesh is from canonical form
+    output: dict of
+    tangency: largest distance of an edge's tangent point from the unit sphere
+    planarity: largest distance of a vert from the plane of one of its faces
+    center: distance of the center of the tangent points from the origin
+    """
+    return _residuals(np.asarray(verts, dtype=float), len(faces),
+                      *mesh_arrays(faces))
+
+
+def _residuals(verts, nfaces, corner_face, corner_vert, corner_next, edges):
+    tangents = _tangent_points(verts, edges)
+    centers, norms = _face_planes(verts, corner_face, corner_vert,
+                                  corner_next, nfaces)
+    dist = np.einsum('ij,ij->i', verts[corner_vert] - centers[corner_face],
+                     norms[corner_face])
+    return {'tangency': float(np.abs(1 - np.linalg.norm(tangents, axis=1)).max()),
+            'planarity': float(np.abs(dist).max()),
+            'center': float(np.linalg.norm(tangents.mean(axis=0)))}
+
+
+class _System:
+    """
+    residuals and Jacobian of the canonical form conditions at one set of
+    verts and face planes, the Jacobian is only ever applied, never stored
+
+    The unknowns are the verts x and, for each face, p such that the face
+    plane is p . x = 1 (p is the matching vert of the reciprocal, or dual,
+    polyhedron).  The planarity residual p . x - 1 of each corner is then
+    linear in each of x and p, so its Jacobian is exact.
+    """
+
+    def __init__(self, verts, planes, corner_face, corner_vert, edges):
+        self.nverts = len(verts)
+        self.nfaces = len(planes)
+        self.corner_face = corner_face
+        self.corner_vert = corner_vert
+        self.edges = edges
+        self.verts = verts
+        self.planes = planes
+
+        # tangency, the derivative of the distance of an edge from the
+        # origin is (1 - s) t_hat at v1 and s t_hat at v2
+        v1_xyz = verts[edges[:, 0]]
+        d_xyz = verts[edges[:, 1]] - v1_xyz
+        self.s = -(np.einsum('ij,ij->i', v1_xyz, d_xyz) /
+                   np.einsum('ij,ij->i', d_xyz, d_xyz))[:, None]
+        tangents = v1_xyz + self.s * d_xyz
+        lengths = np.linalg.norm(tangents, axis=1)
+        self.t_hat = tangents / np.maximum(lengths, 1e-12)[:, None]
+        # the center residual is the mean tangent point, weighted as much as
+        # one edge for each of its 3 coords
+        self.w_center = np.sqrt(len(edges)) / len(edges)
+
+        self.x_corner = verts[corner_vert]
+        self.p_corner = planes[corner_face]
+        self.r_tang = lengths - 1
+        self.r_plane = np.einsum('ij,ij->i', self.x_corner, self.p_corner) - 1
+        self.r_center = self.w_center * tangents.sum(axis=0)
+
+        # diagonal of J^T J, for a Jacobi preconditioner
+        self.diag_x = (_scatter(edges[:, 0], ((1 - self.s) * self.t_hat) ** 2,
+                                self.nverts) +
+                       _scatter(edges[:, 1], (self.s * self.t_hat) ** 2,
+                                self.nverts) +
+                       _scatter(corner_vert, self.p_corner ** 2, self.nverts))
+        self.diag_p = _scatter(corner_face, self.x_corner ** 2, self.nfaces)
+
+    def objective(self):
+        return (self.r_tang.dot(self.r_tang) + self.r_plane.dot(self.r_plane) +
+                self.r_center.dot(self.r_center))
+
+    def apply(self, dx, dp):
+        """
+        J (dx, dp)
+        """
+        edges = self.edges
+        d_edge = (1 - self.s) * dx[edges[:, 0]] + self.s * dx[edges[:, 1]]
+        j_tang = np.einsum('ij,ij->i', self.t_hat, d_edge)
+        j_plane = (np.einsum('ij,ij->i', self.p_corner, dx[self.corner_vert]) +
+                   np.einsum('ij,ij->i', self.x_corner, dp[self.corner_face]))
+        j_center = self.w_center * d_edge.sum(axis=0)
+        return j_tang, j_plane, j_center
+
+    def apply_t(self, y_tang, y_plane, y_center):
+        """
+        J^T y
+        """
+        edges = self.edges
+        y_edge = y_tang[:, None] * self.t_hat + self.w_center * y_center
+        grad_x = (_scatter(edges[:, 0], (1 - self.s) * y_edge, self.nverts) +
+                  _scatter(edges[:, 1], self.s * y_edge, self.nverts) +
+                  _scatter(self.corner_vert, y_plane[:, None] * self.p_corner,
+                           self.nverts))
+        grad_p = _scatter(self.corner_face, y_plane[:, None] * self.x_corner,
+                          self.nfaces)
+        return grad_x, grad_p
+
+    def step(self, damping, cg_iters):
+        """
+        solve (J^T J + damping I) d = -J^T r for d = (dx, dp) by
+        preconditioned conjugate gradients
+        """
+        def matvec(d):
+            return [g + damping * d_i
+                    for g, d_i in zip(self.apply_t(*self.apply(*d)), d)]
+
+        def dot(a, b):
+            return sum(np.vdot(a_i, b_i) for a_i, b_i in zip(a, b))
+
+        precond = [1 / (self.diag_x + damping), 1 / (self.diag_p + damping)]
+        d = [np.zeros((self.nverts, 3)), np.zeros((self.nfaces, 3))]
+        res = [-g for g in self.apply_t(self.r_tang, self.r_plane,
+                                        self.r_center)]
+        z = [m * r for m, r in zip(precond, res)]
+        p = [z_i.copy() for z_i in z]
+        rz = dot(res, z)
+        stop = 1e-20 + 1e-8 * rz
+        for i in range(cg_iters):
+            ap = matvec(p)
+            alpha = rz / dot(p, ap)
+            d = [d_i + alpha * p_i for d_i, p_i in zip(d, p)]
+            res = [r - alpha * a for r, a in zip(res, ap)]
+            z = [m * r for m, r in zip(precond, res)]
+            rz_new = dot(res, z)
+            if rz_new < stop:
+                break
+            p = [z_i + (rz_new / rz) * p_i for z_i, p_i in zip(z, p)]
+            rz = rz_new
+        return d
+
+
+def approx_canonize(verts, faces, solves=10, tol=1e-6, cg_iters=50):
+    """
+    move verts toward canonical form in a few sparse least-squares solves
+    inputs:
+    verts: list or array of x, y, z coords of verticies
+    faces: list of indcies of verts in each face
+    solves: largest number of linear solves
+    tol: stop when all the residuals are below tol
+    cg_iters: largest number of conjugate gradient iterations in a solve
+    output:
+    verts_out: list of x, y, z coords
+    res: residuals of verts_out, as from residuals(), no larger than those
+         of the centered and scaled input
+    """
+    verts = np.array(verts, dtype=float)
+    arrays = mesh_arrays(faces)
+    edges = arrays[3]
+
+    # project onto the sphere through the edge tangent points
+    verts -= verts.mean(axis=0)
+    radius = np.linalg.norm(_tangent_points(verts, edges), axis=1).mean()
+    verts /= radius
+
+    # start each face plane at the plane through its centroid
+    corner_face, corner_vert, corner_next, edges = arrays
+    centers, norms = _face_planes(verts, corner_face, corner_vert,
+                                  corner_next, len(faces))
+    planes = norms / np.einsum('ij,ij->i', norms, centers)[:, None]
+
+    system = _System(verts, planes, corner_face, corner_vert, edges)
+    objective = system.objective()
+    damping = 1e-3
+    res = _residuals(verts, len(faces), *arrays)
+    # steps are chosen on the sum of squares, the result is the verts with
+    # the smallest worst residual seen
+    best_verts, best_res = verts, res
+    for i in range(solves):
+        if max(best_res.values()) < tol:
+            break
+        dx, dp = system.step(damping, cg_iters)
+        # backtrack along the solved step before paying for another solve
+        for scale in (1, 0.5, 0.25):
+            system_new = _System(system.verts + scale * dx,
+                                 system.planes + scale * dp,
+                                 corner_face, corner_vert, edges)
+            objective_new = system_new.objective()
+            if objective_new < objective:
+                break
+        if objective_new < objective:
+            system, objective = system_new, objective_new
+            res = _residuals(system.verts, len(faces), *arrays)
+            if max(res.values()) < max(best_res.values()):
+                best_verts, best_res = system.verts, res
+            # trust the linear model more after a full step
+            if scale == 1:
+                damping = max(damping / 3, 1e-9)
+        else:
+            damping *= 10
+    return best_verts.tolist(), best_res
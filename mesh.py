@@ -0,0 +1,46 @@
+"""
+flat numpy arrays for the half-edges of a face list
+
+Shared by the vectorized modules (canon_approx, validate, triangulate).
+A mesh with faces [[0, 1, 2], [0, 2, 3]] has one corner (half-edge) for
+each vert of each face, in face order, so corner k runs from
+corner_vert[k] to corner_next[k] in face corner_face[k].
+"""
+from itertools import chain
+import numpy as np
+
+
+def corners(faces):
+    """
+    half-edge arrays for a list of faces, or an (nfaces, n) array of faces
+    that all have n verts
+    output:
+    corner_face: face index of each corner (half-edge)
+    corner_vert: vert index of each corner
+    corner_next: index of the next CCW vert in the face
+    """
+    if isinstance(faces, np.ndarray):
+        corner_face = np.repeat(np.arange(len(faces)), faces.shape[1])
+        return corner_face, faces.ravel(), np.roll(faces, -1, axis=1).ravel()
+    sizes = np.fromiter(map(len, faces), dtype=int, count=len(faces))
+    corner_face = np.repeat(np.arange(len(faces)), sizes)
+    corner_vert = np.fromiter(chain.from_iterable(faces), dtype=int,
+                              count=int(sizes.sum()))
+    # next corner is one on, except at the end of a face where it wraps
+    # back to the face's first corner
+    starts = np.cumsum(sizes) - sizes
+    next_i = np.arange(len(corner_vert)) + 1
+    ends = starts + sizes - 1
+    next_i[ends[sizes > 0]] = starts[sizes > 0]
+    return corner_face, corner_vert, corner_vert[next_i]
+
+
+def mesh_arrays(faces):
+    """
+    corners(faces) and also
+    edges: (n, 2) array of undirected edges with v1 < v2
+    """
+    corner_face, corner_vert, corner_next = corners(faces)
+    fwd = corner_vert < corner_next
+    edges = np.stack((corner_vert[fwd], corner_next[fwd]), axis=1)
+    return corner_face, corner_vert, corner_next, edges
@@ -0,0 +1,201 @@
+"""
+Conway notation strings for the operators in conway.py
+
+A notation string is read right to left, so "aD" is ambo applied to the
+seed D and "kd" on a mesh is dual followed by kis.  This is the opposite of
+the left to right node order used in Sverchok.  The seed letters are those
+of seeds.py.
+
+enumerate_notations lists every operator string up to a given length and
+keeps only one string for each different topology, so the expensive
+geometry and canonize stages are run once per distinct polyhedron.
+"""
+from itertools import product
+import re
+import conway
+import reorder
+import seeds
+import topology
+
+
+OPERATORS = {
+    'k': conway.kis,
+    'd': conway.dual,
+    'a': conway.ambo,
+    'c': conway.chamfer,
+    'g': conway.gyro,
+    'p': conway.propellor,
+    'w': conway.whirl,
+}
+
+
+# verts, edges and faces of each operator's output from those of its input
+COUNTS = {
+    'k': lambda v, e, f: (v + f, 3 * e, 2 * e),
+    'd': lambda v, e, f: (f, e, v),
+    'a': lambda v, e, f: (e, 2 * e, f + v),
+    'c': lambda v, e, f: (v + 2 * e, 4 * e, f + e),
+    'g': lambda v, e, f: (v + 2 * e + f, 5 * e, 2 * e),
+    'p': lambda v, e, f: (v + 2 * e, 5 * e, f + 2 * e),
+    'w': lambda v, e, f: (v + 4 * e, 7 * e, f + 2 * e),
+}
+
+
+def counts(notation, nverts, nedges, nfaces):
+    """
+    numbers of verts, edges and faces after applying notation to a mesh
+    with the given counts, without building it
+    """
+    for op_t in reversed(notation):
+        _operator(op_t, notation)
+        nverts, nedges, nfaces = COUNTS[op_t](nverts, nedges, nfaces)
+    return nverts, nedges, nfaces
+
+
+def _operator(op_t, notation):
+    try:
+        return OPERATORS[op_t]
+    except KeyError:
+        raise ValueError('unknown operator {!r} in {!r}'.format(op_t, notation))
+
+
+def apply_notation(notation, verts, faces, order=None, params=None):
+    """
+    apply the operators in notation (right to left) to the mesh verts, faces
+    order: optional reorder method ('bfs' or 'morton') used to renumber
+           the output of each operator, see reorder.reorder_mesh and
+           apply_notation_ordered
+    params: optional dict from operator letter to a dict of its keyword
+            arguments, e.g. {'k': {'height': 0.2}}
+    """
+    if order is not None:
+        verts, faces, vert_order, face_order = apply_notation_ordered(
+            notation, verts, faces, order, params)
+        return verts, faces
+    params = params or {}
+    for op_t in reversed(notation):
+        verts, faces = _operator(op_t, notation)(verts, faces,
+                                                 **params.get(op_t, {}))
+    return verts, faces
+
+
+def apply_notation_ordered(notation, verts, faces, order='bfs', params=None):
+    """
+    apply_notation, renumbering the output of each operator with
+    reorder.reorder_mesh, and return the permutations of the last one
+    output:
+    verts, faces
+    vert_order, face_order: vert_order[new index] = index of the vert in the
+                            output of the last operator before it was
+                            renumbered, the same for faces
+
+    An empty notation has no operator output, the mesh is returned as it
+    is with identity permutations.
+    """
+    params = params or {}
+    vert_order = list(range(len(verts)))
+    face_order = list(range(len(faces)))
+    for op_t in reversed(notation):
+        verts, faces = _operator(op_t, notation)(verts, faces,
+                                                 **params.get(op_t, {}))
+        verts, faces, vert_order, face_order = reorder.reorder_mesh(
+            verts, faces, order)
+    return verts, faces, vert_order, face_order
+
+
+def parse(text):
+    """
+    split a notation with a seed, such as "gkC" or "aA5", into the operator
+    string and the seed name
+    """
+    match = re.fullmatch(r'([a-z]*)([A-Z][0-9]*)', text)
+    if match is None:
+        raise ValueError('notation {!r} should be operators then a seed'.format(text))
+    return match.groups()
+
+
+def polyhedron(text, order=None, params=None):
+    """
+    verts and faces for a notation with a seed, such as "gkC"
+    """
+    ops, seed_t = parse(text)
+    return apply_notation(ops, *seeds.seed(seed_t), order=order, params=params)
+
+
+def enumerate_notations(verts, faces, length, ops='kdacgpw', mirror=True,
+                        finish=None):
+    """
+    apply every operator string up to length to a seed and drop duplicates
+    inputs:
+    verts, faces: the seed mesh
+    length: longest notation string
+    ops: string of the operator letters to use
+    mirror: treat mirror images (e.g. the two gyro forms) as the same
+    finish: optional function (verts, faces) -> (verts, faces) applied only
+            to the unique results, e.g. a canonize step
+    output:
+    unique: dict from notation to (verts, faces) for each distinct topology,
+            the identity is included with notation ''
+    same_as: dict from every notation up to length to the notation in
+             unique with the same topology
+
+    Strings are built one operator at a time from the unique strings of the
+    previous length.  An operator applied to isomorphic meshes gives
+    isomorphic meshes, so extending a duplicate can never find anything new
+    and whole branches (such as everything starting with "dd") are skipped.
+    Each result is hashed with topology.fingerprint and only results with
+    a matching hash are checked with topology.isomorphic.
+
+    This only holds for matches that keep the orientation: gyro, propellor
+    and whirl are chiral, so applied to two mirror images they can give
+    different topologies.  The search therefore never matches mirror
+    images, and with mirror set they are merged only at the end.
+    """
+    unique = {'': (verts, faces)}
+    same_as = {'': ''}
+    by_hash = {topology.fingerprint(faces): ['']}
+    level = ['']
+    for i in range(length):
+        next_level = []
+        for base, op_t in product(level, ops):
+            notation = op_t + base
+            if same_as[base] != base:
+                # filled in below once this level's unique strings are known
+                next_level.append(notation)
+                continue
+            verts_op, faces_op = apply_notation(op_t, *unique[base])
+            key = topology.fingerprint(faces_op)
+            match = notation
+            for other in by_hash.get(key, []):
+                if topology.isomorphic(faces_op, unique[other][1], mirror=False):
+                    match = other
+                    break
+            if match == notation:
+                unique[notation] = (verts_op, faces_op)
+                by_hash.setdefault(key, []).append(notation)
+            same_as[notation] = match
+            next_level.append(notation)
+
+        # op applied to a duplicate matches op applied to its original
+        for notation in next_level:
+            if notation not in same_as:
+                same_as[notation] = same_as[notation[0] + same_as[notation[1:]]]
+        level = next_level
+
+    if mirror:
+        # merge mirror images, keeping the first (shortest) notation
+        merged = {}
+        for others in by_hash.values():
+            for i, notation in enumerate(others):
+                for other in others[:i]:
+                    if other not in merged and topology.isomorphic(
+                            unique[notation][1], unique[other][1], mirror=True):
+                        merged[notation] = other
+                        del unique[notation]
+                        break
+        same_as = {notation: merged.get(match, match)
+                   for notation, match in same_as.items()}
+
+    if finish is not None:
+        unique = {notation: finish(*mesh) for notation, mesh in unique.items()}
+    return unique, same_as
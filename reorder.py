@@ -0,0 +1,119 @@
+"""
+functions to renumber the verts and faces of a mesh for better memory locality
+
+The operators number new verts in the order they are built and faces in
+the dict order of their tags, so neighbouring verts can be far apart in the
+verts list.  The next operator, canonize and Blender's drawing all walk
+the faces and look up their verts, which is faster when the verts of a face
+and of neighbouring faces are close together in memory.
+
+reorder_mesh renumbers the verts, either in breadth first order over the
+edges (Cuthill-McKee) or along a Morton (z-order) space filling curve,
+then sorts the faces by their lowest new vert index.
+"""
+
+
+def vert_neighbours(nverts, faces):
+    """
+    list of the neighbouring vert indices of each vert
+    """
+    nbrs = [set() for v1 in range(nverts)]
+    for face in faces:
+        for v1, v2 in zip(face, face[1:] + face[:1]):
+            nbrs[v1].add(v2)
+            nbrs[v2].add(v1)
+    return [sorted(v_nbrs) for v_nbrs in nbrs]
+
+
+def bfs_order(verts, faces):
+    """
+    vert order from a breadth first search over the edges
+    starting from a vert of lowest degree, with the neighbours of each vert
+    visited lowest degree first (Cuthill-McKee)
+    returns vert_order where vert_order[new index] = old index
+    """
+    nbrs = vert_neighbours(len(verts), faces)
+    seen = [False] * len(verts)
+    vert_order = []
+    # loop over starts so meshes in several parts are all covered
+    for start in sorted(range(len(verts)), key=lambda v1: len(nbrs[v1])):
+        if seen[start]:
+            continue
+        seen[start] = True
+        queue = [start]
+        head = 0
+        while head < len(queue):
+            v1 = queue[head]
+            head += 1
+            for v2 in sorted(nbrs[v1], key=lambda v2: len(nbrs[v2])):
+                if not seen[v2]:
+                    seen[v2] = True
+                    queue.append(v2)
+        vert_order.extend(queue)
+    return vert_order
+
+
+def _spread_bits(n):
+    """
+    put two zero bits between each of the lowest 10 bits of n
+    """
+    n &= 0x3ff
+    n = (n | (n << 16)) & 0x30000ff
+    n = (n | (n << 8)) & 0x300f00f
+    n = (n | (n << 4)) & 0x30c30c3
+    n = (n | (n << 2)) & 0x9249249
+    return n
+
+
+def morton_order(verts, faces=None):
+    """
+    vert order along a Morton (z-order) curve through the bounding box
+    returns vert_order where vert_order[new index] = old index
+    """
+    x_co, y_co, z_co = zip(*verts)
+    lows = [min(co) for co in (x_co, y_co, z_co)]
+    size = max(max(co) - low for co, low in zip((x_co, y_co, z_co), lows))
+    scale = 1023 / size if size > 0 else 0.0
+
+    def key(v1):
+        x, y, z = [int((c - low) * scale) for c, low in zip(verts[v1], lows)]
+        return _spread_bits(x) | (_spread_bits(y) << 1) | (_spread_bits(z) << 2)
+
+    return sorted(range(len(verts)), key=key)
+
+
+ORDERS = {
+    'bfs': bfs_order,
+    'morton': morton_order,
+}
+
+
+def reorder_mesh(verts, faces, method='bfs'):
+    """
+    renumber verts and faces so that neighbours are close in memory
+    inputs:
+    verts: list of x, y, z coords of verticies
+    faces: list of indcies of verts in each face
+    method: 'bfs' or 'morton'
+    output:
+    verts_out, faces_out: the same mesh renumbered
+    vert_order: vert_order[new index] = old vert index
+    face_order: face_order[new index] = old face index
+
+    Each face keeps its CCW order but is rotated to start at its lowest
+    new vert index, then the faces are sorted by that vert.
+    """
+    vert_order = ORDERS[method](verts, faces)
+    new_index = [0] * len(verts)
+    for v_new, v_old in enumerate(vert_order):
+        new_index[v_old] = v_new
+    verts_out = [verts[v_old] for v_old in vert_order]
+
+    faces_new = []
+    for face in faces:
+        face = [new_index[v1] for v1 in face]
+        argmin = face.index(min(face))
+        faces_new.append(face[argmin:] + face[:argmin])
+    face_order = sorted(range(len(faces)), key=lambda face_i: faces_new[face_i])
+    faces_out = [faces_new[face_i] for face_i in face_order]
+    return verts_out, faces_out, vert_order, face_order
@@ -0,0 +1,159 @@
+"""
+seed polyhedra for the Conway operators
+
+The five Platonic solids are stored as fixed tables, with every vertex on
+the unit sphere, and prisms, antiprisms and pyramids with any number of
+sides are generated.  Nothing here needs Blender, so batch scripts can use
+the seeds without loading the add_mesh_extra_objects add-on.
+
+Seeds are named with Conway notation letters: T C O D I for the Platonic
+solids and Pn An Yn for the n sided prism, antiprism and pyramid, e.g. "P5".
+seed() caches each mesh it makes and returns the same verts and faces lists
+on every call, so treat them as read only.  The operators in conway.py
+never change their inputs.
+"""
+from functools import lru_cache
+from math import cos, pi, sin, sqrt
+
+
+# ---- Platonic solids
+# faces are CCW seen from outside, verts on the unit sphere
+
+_S3 = 1 / sqrt(3)
+_PHI = (1 + sqrt(5)) / 2
+
+PLATONIC = {
+    'T': (
+        ((_S3, _S3, _S3), (_S3, -_S3, -_S3), (-_S3, _S3, -_S3), (-_S3, -_S3, _S3)),
+        ((0, 3, 1), (0, 2, 3), (0, 1, 2), (1, 3, 2)),
+    ),
+    'C': (
+        ((-_S3, -_S3, -_S3), (_S3, -_S3, -_S3), (_S3, _S3, -_S3), (-_S3, _S3, -_S3),
+         (-_S3, -_S3, _S3), (_S3, -_S3, _S3), (_S3, _S3, _S3), (-_S3, _S3, _S3)),
+        ((0, 3, 2, 1), (0, 1, 5, 4), (0, 4, 7, 3),
+         (6, 5, 1, 2), (6, 2, 3, 7), (6, 7, 4, 5)),
+    ),
+    'O': (
+        ((0, 0, 1), (1, 0, 0), (0, 1, 0), (-1, 0, 0), (0, -1, 0), (0, 0, -1)),
+        ((0, 1, 2), (0, 2, 3), (0, 3, 4), (0, 4, 1),
+         (1, 5, 2), (2, 5, 3), (3, 5, 4), (4, 5, 1)),
+    ),
+    'D': (
+        ((_S3, _S3, _S3), (_S3, _S3, -_S3), (_S3, -_S3, _S3), (_S3, -_S3, -_S3),
+         (-_S3, _S3, _S3), (-_S3, _S3, -_S3), (-_S3, -_S3, _S3), (-_S3, -_S3, -_S3),
+         (_S3 / _PHI, _S3 * _PHI, 0), (-_S3 / _PHI, _S3 * _PHI, 0),
+         (_S3 / _PHI, -_S3 * _PHI, 0), (-_S3 / _PHI, -_S3 * _PHI, 0),
+         (_S3 * _PHI, 0, _S3 / _PHI), (_S3 * _PHI, 0, -_S3 / _PHI),
+         (-_S3 * _PHI, 0, _S3 / _PHI), (-_S3 * _PHI, 0, -_S3 / _PHI),
+         (0, _S3 / _PHI, _S3 * _PHI), (0, -_S3 / _PHI, _S3 * _PHI),
+         (0, _S3 / _PHI, -_S3 * _PHI), (0, -_S3 / _PHI, -_S3 * _PHI)),
+        ((0, 8, 9, 4, 16), (0, 12, 13, 1, 8), (0, 16, 17, 2, 12),
+         (8, 1, 18, 5, 9), (12, 2, 10, 3, 13), (16, 4, 14, 6, 17),
+         (9, 5, 15, 14, 4), (6, 11, 10, 2, 17), (3, 19, 18, 1, 13),
+         (7, 15, 5, 18, 19), (7, 11, 6, 14, 15), (7, 19, 3, 10, 11)),
+    ),
+    'I': (
+        tuple((x / sqrt(1 + _PHI * _PHI), y / sqrt(1 + _PHI * _PHI),
+               z / sqrt(1 + _PHI * _PHI)) for x, y, z in (
+            (_PHI, 1, 0), (-_PHI, 1, 0), (_PHI, -1, 0), (-_PHI, -1, 0),
+            (1, 0, _PHI), (1, 0, -_PHI), (-1, 0, _PHI), (-1, 0, -_PHI),
+            (0, _PHI, 1), (0, -_PHI, 1), (0, _PHI, -1), (0, -_PHI, -1))),
+        ((0, 8, 4), (0, 5, 10), (2, 4, 9), (2, 11, 5), (1, 6, 8),
+         (1, 10, 7), (3, 9, 6), (3, 7, 11), (0, 10, 8), (1, 8, 10),
+         (2, 9, 11), (3, 11, 9), (4, 2, 0), (5, 0, 2), (6, 1, 3),
+         (7, 3, 1), (8, 6, 4), (9, 4, 6), (10, 5, 7), (11, 7, 5)),
+    ),
+}
+
+# names used by add_mesh_extra_objects.add_mesh_solid.source
+PLATO_NAMES = {'4': 'T', '6': 'C', '8': 'O', '12': 'D', '20': 'I'}
+
+
+# ---- generated seeds
+
+def _ring(n, z, offset=0.0):
+    """
+    n verts evenly spaced CCW on the unit circle at height z
+    """
+    return [[cos(2 * pi * (i + offset) / n), sin(2 * pi * (i + offset) / n), z]
+            for i in range(n)]
+
+
+def prism(n):
+    """
+    n sided prism with square sides, the ring verts on the unit circle
+    """
+    if n < 3:
+        raise ValueError('a prism needs at least 3 sides')
+    half = sin(pi / n)
+    verts = _ring(n, -half) + _ring(n, half)
+    faces = [list(range(n - 1, -1, -1)), list(range(n, 2 * n))]
+    for i in range(n):
+        j = (i + 1) % n
+        faces.append([i, j, n + j, n + i])
+    return verts, faces
+
+
+def antiprism(n):
+    """
+    n sided antiprism with equilateral triangle sides,
+    the ring verts on the unit circle
+    """
+    if n < 3:
+        raise ValueError('an antiprism needs at least 3 sides')
+    side = 2 * sin(pi / n)
+    half = sqrt(side * side - (2 * sin(pi / (2 * n))) ** 2) / 2
+    verts = _ring(n, -half) + _ring(n, half, 0.5)
+    faces = [list(range(n - 1, -1, -1)), list(range(n, 2 * n))]
+    for i in range(n):
+        j = (i + 1) % n
+        faces.append([i, j, n + i])
+        faces.append([n + i, j, n + j])
+    return verts, faces
+
+
+def pyramid(n):
+    """
+    n sided pyramid, the base verts on the unit circle
+    the sloping edges are the same length as the base edges when n < 6,
+    otherwise the apex is at height 1, the centroid of the verts is at the
+    origin
+    """
+    if n < 3:
+        raise ValueError('a pyramid needs at least 3 sides')
+    side = 2 * sin(pi / n)
+    height = sqrt(side * side - 1) if n < 6 else 1.0
+    z_base = -height / (n + 1)
+    verts = _ring(n, z_base) + [[0.0, 0.0, height + z_base]]
+    faces = [list(range(n - 1, -1, -1))]
+    for i in range(n):
+        faces.append([i, (i + 1) % n, n])
+    return verts, faces
+
+
+GENERATORS = {'P': prism, 'A': antiprism, 'Y': pyramid}
+
+
+@lru_cache(maxsize=128)
+def seed(name):
+    """
+    verts and faces of the seed called name, e.g. "C", "I", "P5", "A7"
+    verts are lists of x, y, z coords, faces lists of vert indices CCW.
+    The same lists are returned each time, do not change them.
+    """
+    if name in PLATONIC:
+        verts, faces = PLATONIC[name]
+        return [list(v_xyz) for v_xyz in verts], [list(face) for face in faces]
+    if name[:1] in GENERATORS and name[1:].isdigit():
+        return GENERATORS[name[0]](int(name[1:]))
+    raise ValueError('unknown seed {!r}'.format(name))
+
+
+def source(plato):
+    """
+    drop in for add_mesh_extra_objects.add_mesh_solid.source
+    plato: "4", "6", "8", "12" or "20"
+    returns new lists of verts and faces that can be changed
+    """
+    verts, faces = seed(PLATO_NAMES[plato])
+    return [v_xyz[:] for v_xyz in verts], [face[:] for face in faces]
@@ -0,0 +1,605 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+long running server for polyhedron requests, and a command line client
+
+Starting Blender or a new python process for every polyhedron spends most
+of its time importing and building seeds.  The server stays running with
+the seeds, operator results, symmetry groups, canonized verts and triangles
+cached, so a request only pays for the work that has not been done before.
+Each cache is bounded by the total size of the meshes in it.
+
+    python server.py serve --address /tmp/conway.sock
+    python server.py run --address /tmp/conway.sock gkC aD --canonize approx
+
+An address is a Unix socket path, or host:port (or just a port) for a TCP
+socket on localhost, other hosts are refused as there is no authentication.
+Each client connection is handled in its own thread.
+
+A request is a dict:
+    notation: operators and seed, e.g. "gkC", see notation.parse
+    params: optional {operator letter: {keyword: value}}, e.g.
+            {"k": {"height": 0.2}}
+    canonize: None, "approx" (canon_approx.approx_canonize) or
+              "symmetric" (symmetry.canonize_symmetric)
+    solves: solves for "approx", default 10
+    iterations, scale_factor: for "symmetric", default 200 and 0.1
+    triangulate: also return triangles, default False
+Unknown keys or values of the wrong type fail that request only, as do
+requests over the limits below (MAX_OPERATORS, MAX_FACES, MAX_SOLVES,
+MAX_ITERATIONS).
+
+Wire format, both ways: a frame is a 4 byte big-endian length then that
+many bytes.  The client sends one frame of JSON {"requests": [request, ...]},
+at most MAX_FRAME bytes.
+The server replies with a JSON frame {"results": [result, ...]} and a frame
+holding the raw bytes of every array.  Each result has "arrays", a dict of
+name -> [dtype, shape, offset, nbytes] into the bytes frame, "residuals" if
+canonized, and "error" (a string) if the request failed.  The arrays are
+verts (float64, n x 3), face_sizes and face_verts (int32, the faces
+flattened), and tris and tri_face (int32) if asked for.
+"""
+import argparse
+from collections import OrderedDict, namedtuple
+from functools import lru_cache, update_wrapper
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import stat
+import struct
+import sys
+import threading
+
+import numpy as np
+
+import canon_approx
+import notation
+import seeds
+import symmetry
+import triangulate
+
+
+# limits on the work one request can cause
+MAX_FRAME = 1 << 20
+MAX_OPERATORS = 16
+MAX_SEED_SIDES = 1000
+MAX_FACES = 200000
+MAX_SOLVES = 1000
+MAX_ITERATIONS = 10000
+# total size of the meshes each cache may hold, in verts plus corners
+CACHE_SIZE = 4000000
+
+
+# ---- cached evaluation
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses entries size')
+
+
+class _SizedCache:
+    """
+    least recently used cache of fn bounded by the total size of its
+    values rather than their number, size(value) gives the size of one
+    """
+
+    def __init__(self, fn, max_size, size):
+        update_wrapper(self, fn)
+        self.fn = fn
+        self.max_size = max_size
+        self.size = size
+        self.entries = OrderedDict()
+        self.total = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *key):
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return self.entries[key][0]
+            self.misses += 1
+        # not locked while working, two threads may build the same value
+        value = self.fn(*key)
+        cost = self.size(value)
+        with self.lock:
+            if key not in self.entries and cost <= self.max_size:
+                self.entries[key] = (value, cost)
+                self.total += cost
+                while self.total > self.max_size:
+                    self.total -= self.entries.popitem(last=False)[1][1]
+        return value
+
+    def cache_info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, len(self.entries), self.total)
+
+    def cache_clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total = 0
+
+
+def _sized_cache(size):
+    """
+    decorator, a _SizedCache of CACHE_SIZE
+    """
+    return lambda fn: _SizedCache(fn, CACHE_SIZE, size)
+
+
+def _mesh_size(mesh):
+    verts, faces = mesh
+    return len(verts) + sum(len(face) for face in faces)
+
+
+def _arrays_size(arrays):
+    return sum(len(array) for array in arrays
+               if isinstance(array, np.ndarray))
+
+
+def _params_key(params):
+    """
+    hashable form of a params dict
+    """
+    return tuple(sorted((op_t, tuple(sorted(kw.items())))
+                        for op_t, kw in (params or {}).items()))
+
+
+def _params_for(ops, params_key):
+    """
+    the part of params_key for the letters in ops
+    """
+    return tuple((op_t, kw) for op_t, kw in params_key if op_t in ops)
+
+
+@_sized_cache(_mesh_size)
+def _build(ops, seed_t, params_key):
+    """
+    operator output for ops on a seed, built from the cached result for
+    the ops without their first (outermost) letter
+    params_key: only for the letters in ops, see _params_for, so "kgC" with
+                params for k reuses "gC"
+    """
+    if not ops:
+        return seeds.seed(seed_t)
+    verts, faces = _build(ops[1:], seed_t, _params_for(ops[1:], params_key))
+    params = {op_t: dict(kw) for op_t, kw in params_key}
+    return notation.apply_notation(ops[0], verts, faces, params=params)
+
+
+def _check_size(ops, seed_t):
+    """
+    raise ValueError if ops on the seed would make a mesh over the limits,
+    worked out from the counts without building it
+    """
+    if len(ops) > MAX_OPERATORS:
+        raise ValueError('more than {} operators'.format(MAX_OPERATORS))
+    if seed_t[1:] and int(seed_t[1:]) > MAX_SEED_SIDES:
+        raise ValueError('seed {} has more than {} sides'.format(seed_t,
+                                                                MAX_SEED_SIDES))
+    verts, faces = seeds.seed(seed_t)
+    nedges = sum(len(face) for face in faces) // 2
+    nfaces = notation.counts(ops, len(verts), nedges, len(faces))[2]
+    if nfaces > MAX_FACES:
+        raise ValueError('{}{} has {} faces, more than {}'.format(
+            ops, seed_t, nfaces, MAX_FACES))
+
+
+@lru_cache(maxsize=64)
+def _seed_group(seed_t):
+    return symmetry.symmetry_group(*seeds.seed(seed_t))
+
+
+def _canon_key(request):
+    """
+    hashable canonize settings of a request, only those its mode uses,
+    None if it is not canonized
+    """
+    mode = request.get('canonize')
+    if mode == 'approx':
+        return mode, request.get('solves', 10)
+    if mode == 'symmetric':
+        return (mode, request.get('iterations', 200),
+                float(request.get('scale_factor', 0.1)))
+    return None
+
+
+@_sized_cache(_arrays_size)
+def _canonize(ops, seed_t, params_key, canon_key):
+    """
+    canonized verts as an array and their residuals
+    """
+    verts, faces = _build(ops, seed_t, params_key)
+    mode = canon_key[0]
+    if mode == 'approx':
+        solves, = canon_key[1:]
+        verts_canon, res = canon_approx.approx_canonize(verts, faces, solves)
+    elif mode == 'symmetric':
+        iterations, scale_factor = canon_key[1:]
+        verts_canon = symmetry.canonize_symmetric(verts, faces, _seed_group(seed_t),
+                                                  iterations, scale_factor)
+        verts_canon = [list(v_xyz) for v_xyz in verts_canon]
+        res = canon_approx.residuals(verts_canon, faces)
+    else:
+        raise ValueError('unknown canonize mode {!r}'.format(mode))
+    verts_canon = np.array(verts_canon, dtype=float)
+    # shared by every request that hits the cache
+    verts_canon.flags.writeable = False
+    return verts_canon, res
+
+
+def _verts(ops, seed_t, params_key, canon_key):
+    """
+    verts array and residuals (None if not canonized)
+    """
+    if canon_key is None:
+        return np.array(_build(ops, seed_t, params_key)[0], dtype=float), None
+    return _canonize(ops, seed_t, params_key, canon_key)
+
+
+@_sized_cache(_arrays_size)
+def _triangles(ops, seed_t, params_key, canon_key):
+    """
+    triangles and their face indices, kept in the cache with the mesh
+    they were made from, so a mesh is only triangulated once
+    """
+    verts = _verts(ops, seed_t, params_key, canon_key)[0]
+    faces = _build(ops, seed_t, params_key)[1]
+    tris, tri_face = triangulate.triangulate(verts, faces)
+    tris = tris.astype(np.int32)
+    tri_face = tri_face.astype(np.int32)
+    tris.flags.writeable = False
+    tri_face.flags.writeable = False
+    return tris, tri_face
+
+
+@_sized_cache(_arrays_size)
+def _faces_arrays(ops, seed_t, params_key):
+    faces = _build(ops, seed_t, params_key)[1]
+    face_sizes = np.array([len(face) for face in faces], dtype=np.int32)
+    face_verts = np.array([v1 for face in faces for v1 in face], dtype=np.int32)
+    return face_sizes, face_verts
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_count(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def check_request(request):
+    """
+    raise ValueError if request is not a request dict as described in the
+    module docstring
+    """
+    if not isinstance(request, dict):
+        raise ValueError('a request should be a dict not {}'.format(
+            type(request).__name__))
+    unknown = set(request) - {'notation', 'params', 'canonize', 'solves',
+                              'iterations', 'scale_factor', 'triangulate'}
+    if unknown:
+        raise ValueError('unknown request keys {}'.format(sorted(unknown)))
+    if not isinstance(request.get('notation'), str):
+        raise ValueError('notation should be a string')
+    params = request.get('params')
+    if params is not None:
+        if not isinstance(params, dict):
+            raise ValueError('params should be a dict of operator letter to '
+                             'a dict of keyword arguments')
+        for op_t, kw in params.items():
+            if not isinstance(kw, dict) or not all(
+                    isinstance(name, str) and _is_number(value)
+                    for name, value in kw.items()):
+                raise ValueError('params for {!r} should be a dict of '
+                                 'keyword to number'.format(op_t))
+    if request.get('canonize') not in (None, 'approx', 'symmetric'):
+        raise ValueError('unknown canonize mode {!r}'.format(request['canonize']))
+    for name, most in (('solves', MAX_SOLVES), ('iterations', MAX_ITERATIONS)):
+        if name in request and not _is_count(request[name]):
+            raise ValueError('{} should be a whole number'.format(name))
+        if request.get(name, 0) > most:
+            raise ValueError('{} should be at most {}'.format(name, most))
+    if 'scale_factor' in request and not _is_number(request['scale_factor']):
+        raise ValueError('scale_factor should be a number')
+    if not isinstance(request.get('triangulate', False), bool):
+        raise ValueError('triangulate should be true or false')
+
+
+def evaluate(request):
+    """
+    arrays for one request dict (see the module docstring)
+    output:
+    arrays: dict of name -> numpy array
+    residuals: dict from canon_approx.residuals, or None
+    """
+    check_request(request)
+    ops, seed_t = notation.parse(request['notation'])
+    _check_size(ops, seed_t)
+    params_key = _params_for(ops, _params_key(request.get('params')))
+    canon_key = _canon_key(request)
+    verts, residuals = _verts(ops, seed_t, params_key, canon_key)
+    face_sizes, face_verts = _faces_arrays(ops, seed_t, params_key)
+    arrays = {'verts': verts, 'face_sizes': face_sizes, 'face_verts': face_verts}
+    if request.get('triangulate'):
+        arrays['tris'], arrays['tri_face'] = _triangles(ops, seed_t, params_key,
+                                                        canon_key)
+    return arrays, residuals
+
+
+# ---- framing
+
+def send_frame(sock, data):
+    sock.sendall(struct.pack('>I', len(data)) + data)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError('connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock, max_size=None):
+    """
+    bytes of the next frame, ValueError if it is longer than max_size
+    """
+    size, = struct.unpack('>I', _recv_exact(sock, 4))
+    if max_size is not None and size > max_size:
+        raise ValueError('frame of {} bytes is over the limit of {}'.format(
+            size, max_size))
+    return _recv_exact(sock, size)
+
+
+def parse_batch(message):
+    """
+    list of requests from a client frame, ValueError if it is not a JSON
+    object with a "requests" list
+    """
+    batch = json.loads(message.decode())
+    if not isinstance(batch, dict) or not isinstance(batch.get('requests'), list):
+        raise ValueError('expected a JSON object with a "requests" list')
+    return batch['requests']
+
+
+def encode_results(requests):
+    """
+    evaluate a batch of requests and pack them into the two reply frames
+    """
+    results = []
+    blobs = []
+    offset = 0
+    for request in requests:
+        result = {'arrays': {}}
+        try:
+            arrays, residuals = evaluate(request)
+        except Exception as err:
+            # a bad request only fails itself, not the batch or the server
+            result['error'] = '{}: {}'.format(type(err).__name__, err)
+            results.append(result)
+            continue
+        if residuals is not None:
+            result['residuals'] = residuals
+        for name, array in arrays.items():
+            data = np.ascontiguousarray(array).tobytes()
+            result['arrays'][name] = [array.dtype.str, list(array.shape),
+                                      offset, len(data)]
+            blobs.append(data)
+            offset += len(data)
+        results.append(result)
+    return json.dumps({'results': results}).encode(), b''.join(blobs)
+
+
+def decode_results(header, body):
+    """
+    the results of a batch with each array rebuilt from the bytes frame
+    """
+    results = json.loads(header.decode())['results']
+    for result in results:
+        result['arrays'] = {
+            name: np.frombuffer(body, dtype=dtype, count=int(np.prod(shape)),
+                                offset=offset).reshape(shape)
+            for name, (dtype, shape, offset, nbytes) in result['arrays'].items()}
+    return results
+
+
+# ---- server and client
+
+class RequestHandler(socketserver.BaseRequestHandler):
+    """
+    answers batches on one connection until the client closes it
+    """
+
+    def handle(self):
+        while True:
+            try:
+                message = recv_frame(self.request, MAX_FRAME)
+            except ConnectionError:
+                return
+            except ValueError as err:
+                # the rest of the frame is not read, so close the connection
+                header = json.dumps({'error': 'bad request: {}'.format(err)})
+                send_frame(self.request, header.encode())
+                send_frame(self.request, b'')
+                return
+            try:
+                requests = parse_batch(message)
+            except ValueError as err:
+                header = json.dumps({'error': 'bad request: {}'.format(err)})
+                send_frame(self.request, header.encode())
+                send_frame(self.request, b'')
+                continue
+            header, body = encode_results(requests)
+            send_frame(self.request, header)
+            send_frame(self.request, body)
+
+
+class ThreadingUnixServer(socketserver.ThreadingMixIn,
+                          socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def _is_loopback(host):
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def parse_address(address):
+    """
+    (family, address) for a Unix socket path, 'host:port' or a port number
+    the host must be localhost or a loopback address
+    """
+    if address.isdigit():
+        return socket.AF_INET, ('127.0.0.1', int(address))
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and os.sep not in address:
+        host = host or '127.0.0.1'
+        if not _is_loopback(host):
+            raise ValueError('{} is not a localhost address, the server has '
+                             'no authentication'.format(host))
+        return socket.AF_INET, (host, int(port))
+    return socket.AF_UNIX, address
+
+
+def _remove_stale_socket(path):
+    """
+    remove a socket file left behind by a server that has stopped,
+    refuse if path is not a socket or a server is still answering on it
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError('{} exists and is not a socket'.format(path))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(path)
+        except ConnectionRefusedError:
+            os.unlink(path)
+            return
+    raise OSError('a server is already running on {}'.format(path))
+
+
+def make_server(address):
+    family, addr = parse_address(address)
+    if family == socket.AF_UNIX:
+        _remove_stale_socket(addr)
+        return ThreadingUnixServer(addr, RequestHandler)
+    return ThreadingTCPServer(addr, RequestHandler)
+
+
+class Client:
+    """
+    a connection to a running server, can send any number of batches
+    """
+
+    def __init__(self, address):
+        family, addr = parse_address(address)
+        self.sock = socket.socket(family, socket.SOCK_STREAM)
+        self.sock.connect(addr)
+
+    def request(self, requests):
+        """
+        send a list of request dicts, returns a list of result dicts
+        """
+        send_frame(self.sock, json.dumps({'requests': requests}).encode())
+        header = recv_frame(self.sock)
+        body = recv_frame(self.sock)
+        reply = json.loads(header.decode())
+        if 'error' in reply:
+            raise ValueError(reply['error'])
+        return decode_results(header, body)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---- command line
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve = sub.add_parser('serve', help='run the server')
+    serve.add_argument('--address', default='/tmp/conway.sock')
+    run = sub.add_parser('run', help='send a batch to a running server')
+    run.add_argument('--address', default='/tmp/conway.sock')
+    run.add_argument('notations', nargs='+', help='e.g. gkC aD')
+    run.add_argument('--canonize', choices=['approx', 'symmetric'])
+    run.add_argument('--solves', type=int, default=10)
+    run.add_argument('--iterations', type=int, default=200)
+    run.add_argument('--scale-factor', type=float, default=0.1)
+    run.add_argument('--triangulate', action='store_true')
+    run.add_argument('--params', type=json.loads, default=None,
+                     help='JSON, e.g. \'{"k": {"height": 0.2}}\'')
+    run.add_argument('--out', help='save the arrays to this .npz file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        try:
+            server = make_server(args.address)
+        except (OSError, ValueError) as err:
+            print(err)
+            return 1
+        print('serving on {}'.format(args.address))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    requests = [{'notation': text, 'params': args.params,
+                 'canonize': args.canonize, 'solves': args.solves,
+                 'iterations': args.iterations,
+                 'scale_factor': args.scale_factor,
+                 'triangulate': args.triangulate}
+                for text in args.notations]
+    with Client(args.address) as client:
+        results = client.request(requests)
+    arrays_out = {}
+    status = 0
+    for text, result in zip(args.notations, results):
+        if 'error' in result:
+            print('{}: {}'.format(text, result['error']))
+            status = 1
+            continue
+        arrays = result['arrays']
+        line = '{}: {} verts, {} faces'.format(text, len(arrays['verts']),
+                                               len(arrays['face_sizes']))
+        if 'residuals' in result:
+            line += ', residuals ' + ', '.join(
+                '{} {:.2e}'.format(k, v) for k, v in result['residuals'].items())
+        print(line)
+        for name, array in arrays.items():
+            arrays_out['{}/{}'.format(text, name)] = array
+    if args.out:
+        np.savez(args.out, **arrays_out)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,14 @@
+"""
+in solves s d=10 n=1
+in verts_in      v d=[] n=1
+in faces_in         s d=[] n=1
+out verts_out     v
+"""
+
+import bpy
+canon_approx = bpy.data.texts["canon_approx.py"].as_module()
+
+
+verts_canon, res = canon_approx.approx_canonize(verts_in, faces_in, solves)
+
+verts_out.append(verts_canon)
@@ -1,21 +1,27 @@
 """
-in dummy  s
-enum = tetra octa cube dodeca icosa
+in sides  s d=5 n=1
+enum = tetra octa cube dodeca icosa prism antiprism pyramid
 out vertices      v
 out faces         s 
 """
 
-plato = {'tetra': "4",'cube': '6', 'octa': '8', 'dodeca': '12', 'icosa': '20'}
+plato = {'tetra': 'T', 'cube': 'C', 'octa': 'O', 'dodeca': 'D', 'icosa': 'I',
+         'prism': 'P', 'antiprism': 'A', 'pyramid': 'Y'}
 
-from add_mesh_extra_objects.add_mesh_solid import source
+import bpy
+seeds = bpy.data.texts["seeds.py"].as_module()
 
 def ui(self, context, layout):
     layout.prop(self, 'custom_enum', expand=False)
 
 
-vectors, faces = source(plato[self.custom_enum])
+name = plato[self.custom_enum]
+if name in 'PAY':
+    name = name + str(max(3, int(sides)))
+vectors, faces = seeds.seed(name)
 vertices = [list(v) for v in vectors]
+faces = [face[:] for face in faces]
    
 # match  nesting of other Sverchok generators
 vertices = [vertices]
-faces = [faces]
\ No newline at end of file
+faces = [faces]
@@ -0,0 +1,20 @@
+"""
+in verts_in      v d=[] n=1
+in faces_in         s d=[] n=1
+out verts_out     v
+out faces_out        s
+out tris_out        s
+out face_index        s
+"""
+
+import bpy
+triangulate = bpy.data.texts["triangulate.py"].as_module()
+
+
+tris, tri_face = triangulate.triangulate(verts_in, faces_in)
+
+# the mesh is passed on with its triangles so later nodes need not split it
+verts_out.append(verts_in)
+faces_out.append(faces_in)
+tris_out.append(tris.tolist())
+face_index.append(tri_face.tolist())
@@ -0,0 +1,360 @@
+"""
+functions to find and use the rotational symmetry of a polyhedron
+
+Every Conway operator preserves the rotational symmetry of its seed
+(gyro, propellor and whirl keep only the rotations, not the reflections).
+A symmetry group is stored as a list of 3x3 mathutils Matrix rotations.
+For a mesh with that symmetry each rotation permutes the vertices, so only
+one vertex from each orbit (a fundamental domain) needs to be computed,
+the rest are copies of it rotated by a group element.
+
+canonize_symmetric runs the same tangentify, recenter, planarize steps as
+canon.canonize but only moves the orbit representatives.
+"""
+import mathutils
+import conway as cw
+
+
+def _vert_key(v_xyz, tol):
+    """
+    hashable key for a vertex position, rounded to tol
+    """
+    return tuple(int(round(c / tol)) for c in v_xyz)
+
+
+def _vert_lookup(verts, tol):
+    """
+    dict from rounded position key to vertex index
+    """
+    return {_vert_key(v_xyz, tol): v_i for v_i, v_xyz in enumerate(verts)}
+
+
+def _find_vert(lookup, v_xyz, tol):
+    """
+    index of the vertex at v_xyz or None
+    checks the neighbouring keys as well to allow for rounding at a boundary
+    """
+    key = _vert_key(v_xyz, tol)
+    v_i = lookup.get(key)
+    if v_i is not None:
+        return v_i
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for dz in (-1, 0, 1):
+                v_i = lookup.get((key[0] + dx, key[1] + dy, key[2] + dz))
+                if v_i is not None:
+                    return v_i
+    return None
+
+
+def _permutation(rot, verts, lookup, tol):
+    """
+    list where perm[v1] is the index of vertex rot @ verts[v1]
+    or None if rot does not map the verts onto themselves
+    """
+    perm = []
+    for v_xyz in verts:
+        v_i = _find_vert(lookup, rot @ mathutils.Vector(v_xyz), tol)
+        if v_i is None:
+            return None
+        perm.append(v_i)
+    return perm
+
+
+def _face_keys(faces):
+    """
+    set of faces with each face rotated so its lowest index is first
+    """
+    keys = set()
+    for face in faces:
+        argmin = face.index(min(face))
+        keys.add(tuple(face[argmin:] + face[:argmin]))
+    return keys
+
+
+def _maps_faces(perm, faces, face_keys):
+    """
+    True if the vertex permutation maps every face onto a face in the same
+    CCW order
+    """
+    for face in faces:
+        face_p = [perm[v1] for v1 in face]
+        argmin = face_p.index(min(face_p))
+        if tuple(face_p[argmin:] + face_p[:argmin]) not in face_keys:
+            return False
+    return True
+
+
+def _frame(v1_xyz, v2_xyz):
+    """
+    orthonormal frame as a matrix with columns built from two vectors
+    """
+    e1 = v1_xyz.normalized()
+    e3 = v1_xyz.cross(v2_xyz).normalized()
+    e2 = e3.cross(e1)
+    return mathutils.Matrix([e1, e2, e3]).transposed()
+
+
+def symmetry_group(verts, faces, tol=1e-6, reflections=False):
+    """
+    find the symmetries of a mesh centered at the origin
+    inputs:
+    verts: list of x, y, z coords of verticies
+    faces: list of indcies of verts in each face
+    tol: distance within which two verts are treated as the same point
+    reflections: also return improper symmetries (rotation + reflection).
+                 These are not kept by gyro, propellor and whirl.
+    output:
+    group: list of 3x3 mathutils Matrix, the identity is always first
+
+    A symmetry maps the first vertex and one of its neighbours onto another
+    vertex at the same radius and one of its neighbours, so every candidate
+    is built from a pair of edges and checked against all verts and faces.
+    """
+    verts_v = [mathutils.Vector(v_xyz) for v_xyz in verts]
+    lookup = _vert_lookup(verts, tol)
+    face_keys = _face_keys(faces)
+
+    neighbours = [set() for v_xyz in verts]
+    for face in faces:
+        for v1, v2 in zip(face, face[1:] + face[:1]):
+            neighbours[v1].add(v2)
+
+    # choose a vertex and neighbour that are not parallel to build a frame
+    v0 = None
+    for v1, v_nbrs in enumerate(neighbours):
+        for v2 in v_nbrs:
+            if verts_v[v1].cross(verts_v[v2]).length > tol:
+                v0, n0 = v1, v2
+                break
+        if v0 is not None:
+            break
+    if v0 is None:
+        return [mathutils.Matrix.Identity(3)]
+    frame0_inv = _frame(verts_v[v0], verts_v[n0]).transposed()
+    len_v0 = verts_v[v0].length
+    len_n0 = verts_v[n0].length
+    angle0 = verts_v[v0].dot(verts_v[n0])
+
+    group = []
+    seen = set()
+    for v1, v1_xyz in enumerate(verts_v):
+        if abs(v1_xyz.length - len_v0) > tol:
+            continue
+        for v2 in neighbours[v1]:
+            v2_xyz = verts_v[v2]
+            if (abs(v2_xyz.length - len_n0) > tol or
+                    abs(v1_xyz.dot(v2_xyz) - angle0) > tol):
+                continue
+            frame1 = _frame(v1_xyz, v2_xyz)
+            candidates = [frame1 @ frame0_inv]
+            if reflections:
+                flip = mathutils.Matrix([[1, 0, 0], [0, 1, 0], [0, 0, -1]])
+                candidates.append(frame1 @ flip @ frame0_inv)
+            for rot in candidates:
+                perm = _permutation(rot, verts, lookup, tol)
+                if perm is None or tuple(perm) in seen:
+                    continue
+                if rot.determinant() > 0:
+                    if not _maps_faces(perm, faces, face_keys):
+                        continue
+                else:
+                    # a reflection reverses the order of verts in each face
+                    if not _maps_faces(perm, [face[::-1] for face in faces],
+                                       face_keys):
+                        continue
+                seen.add(tuple(perm))
+                group.append(rot)
+
+    # identity first
+    group.sort(key=lambda rot: -sum(rot[i][i] for i in range(3)))
+    return group
+
+
+def vert_permutations(verts, group, tol=1e-6):
+    """
+    for each rotation in group, the list of vertex indices it maps each
+    vertex to.  Raises ValueError if the verts do not have the symmetry.
+
+    Use this to carry a seed's symmetry group over to operator output,
+    which has the same symmetry but new vertices.
+    """
+    lookup = _vert_lookup(verts, tol)
+    perms = []
+    for rot in group:
+        perm = _permutation(rot, verts, lookup, tol)
+        if perm is None:
+            raise ValueError('verts do not have the given symmetry')
+        perms.append(perm)
+    return perms
+
+
+def orbits(perms):
+    """
+    split the verts into orbits under the group
+    input:
+    perms: vertex permutations from vert_permutations
+    output:
+    reps: list of one representative vert index for each orbit
+    vert_orbit: list where vert_orbit[v1] = (rep, g_i) and
+                v1 is the image of rep under group element g_i
+    """
+    nverts = len(perms[0])
+    vert_orbit = [None] * nverts
+    reps = []
+    for v1 in range(nverts):
+        if vert_orbit[v1] is not None:
+            continue
+        reps.append(v1)
+        for g_i, perm in enumerate(perms):
+            if vert_orbit[perm[v1]] is None:
+                vert_orbit[perm[v1]] = (v1, g_i)
+    return reps, vert_orbit
+
+
+def replicate(verts_rep, vert_orbit, group, halo=None):
+    """
+    rebuild verts from the representative verts
+    verts_rep: dict or list indexed by rep vert index giving its coords
+    halo: optional list of the vert indices wanted
+    returns list of mathutils Vector, or a dict if halo is given
+    """
+    if halo is None:
+        return [group[g_i] @ mathutils.Vector(verts_rep[rep])
+                for rep, g_i in vert_orbit]
+    return {v1: group[vert_orbit[v1][1]] @ verts_rep[vert_orbit[v1][0]]
+            for v1 in halo}
+
+
+def symmetrize(verts, group, perms):
+    """
+    average each vertex over its orbit so the verts have the exact symmetry
+    removes the small asymmetries that build up in canonize
+    """
+    verts_v = [mathutils.Vector(v_xyz) for v_xyz in verts]
+    verts_sym = []
+    for v1 in range(len(verts)):
+        vsum = mathutils.Vector()
+        for rot, perm in zip(group, perms):
+            # rot maps v1 to perm[v1] so rot^-1 maps perm[v1] back to v1
+            vsum = vsum + rot.transposed() @ verts_v[perm[v1]]
+        verts_sym.append(vsum / len(group))
+    return verts_sym
+
+
+# ---- canonicalization on a fundamental domain
+
+def _domain(faces, perms, reps):
+    """
+    the edges and faces needed to move the rep verts
+    output:
+    rep_edges: dict rep -> list of (v1, v2) edges with rep as an end
+    rep_faces: dict rep -> list of faces containing rep
+    edge_reps: list of (v1, v2, orbit size) one for each orbit of edges
+    halo: list of all verts used by the above
+    """
+    rep_set = set(reps)
+    rep_edges = {rep: [] for rep in reps}
+    rep_faces = {rep: [] for rep in reps}
+    edge_reps = []
+    edge_seen = set()
+    for face in faces:
+        for v1 in face:
+            if v1 in rep_set:
+                rep_faces[v1].append(face)
+        for v1, v2 in zip(face, face[1:] + face[:1]):
+            if v1 < v2:
+                if v1 in rep_set:
+                    rep_edges[v1].append((v1, v2))
+                if v2 in rep_set:
+                    rep_edges[v2].append((v1, v2))
+                if (v1, v2) not in edge_seen:
+                    orbit = set()
+                    for perm in perms:
+                        orbit.add(tuple(sorted((perm[v1], perm[v2]))))
+                    edge_seen.update(orbit)
+                    edge_reps.append((v1, v2, len(orbit)))
+
+    halo = set(rep_set)
+    for rep in reps:
+        for face in rep_faces[rep]:
+            halo.update(face)
+    for v1, v2, orbit_size in edge_reps:
+        halo.update((v1, v2))
+    return rep_edges, rep_faces, edge_reps, sorted(halo)
+
+
+def _tangent_point(verts, v1, v2):
+    va_xyz, _s = mathutils.geometry.intersect_point_line(
+        mathutils.Vector(), verts[v1], verts[v2])
+    return va_xyz
+
+
+def canonize_symmetric(verts, faces, group, iterations, scale_factor,
+                       tol=1e-6):
+    """
+    repeat tangentify, recenter, planarize for iterations, as for
+    canon.canonize, moving only one vert per orbit of the symmetry group
+    inputs:
+    verts: list of x, y, z coords of verticies with the symmetry of group
+    faces: list of indcies of verts in each face
+    group: list of rotations from symmetry_group, usually found for the seed
+    output:
+    verts_new: list of mathutils Vector
+
+    Each iteration only rebuilds the verts around the fundamental domain so
+    the work is roughly that of canonize divided by the size of the group.
+    """
+    perms = vert_permutations(verts, group, tol)
+    reps, vert_orbit = orbits(perms)
+    rep_edges, rep_faces, edge_reps, halo = _domain(faces, perms, reps)
+    nedges = sum(n for v1, v2, n in edge_reps)
+
+    # projection onto the vectors fixed by every rotation
+    # the center of the tangent points can only move along these
+    proj = [mathutils.Vector(), mathutils.Vector(), mathutils.Vector()]
+    for rot in group:
+        for i in range(3):
+            proj[i] = proj[i] + rot[i]
+    proj = mathutils.Matrix([row / len(group) for row in proj])
+
+    verts_new = symmetrize(verts, group, perms)
+    verts_new = {v1: verts_new[v1] for v1 in halo}
+    for i in range(iterations):
+        verts_old = verts_new
+
+        # tangentify
+        verts_tang = {}
+        for rep in reps:
+            v_xyz = verts_old[rep]
+            for v1, v2 in rep_edges[rep]:
+                va_xyz = _tangent_point(verts_old, v1, v2)
+                v_xyz = v_xyz + scale_factor * 0.5 * (1 - va_xyz.length) * va_xyz
+            verts_tang[rep] = v_xyz
+        verts_tang = replicate(verts_tang, vert_orbit, group, halo)
+
+        # recenter
+        vsum = mathutils.Vector()
+        for v1, v2, orbit_size in edge_reps:
+            vsum = vsum + orbit_size * _tangent_point(verts_tang, v1, v2)
+        center_xyz = proj @ (vsum / nedges)
+        verts_cent = {v1: v_xyz - center_xyz for v1, v_xyz in verts_tang.items()}
+
+        # planarize
+        verts_plane = {}
+        for rep in reps:
+            v_xyz = verts_cent[rep]
+            for face in rep_faces[rep]:
+                center = mathutils.Vector(cw.face_center(verts_cent, face))
+                norm = cw.face_normal(verts_cent, face)
+                r1 = center - verts_cent[rep]
+                v_xyz = v_xyz + (scale_factor * norm).dot(r1) * norm
+            verts_plane[rep] = v_xyz
+
+        max_change = max((verts_plane[rep] - verts_old[rep]).length
+                         for rep in reps)
+        verts_new = replicate(verts_plane, vert_orbit, group, halo)
+        if max_change < 1e-8:
+            break
+    verts_rep = {rep: verts_new[rep] for rep in reps}
+    return replicate(verts_rep, vert_orbit, group)
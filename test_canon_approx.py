@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_canon_approx.py
+
+tests for canon_approx.py
+"""
+import pytest
+import conway
+import canon_approx
+import notation
+
+from seeds import source as solid
+
+
+@pytest.mark.parametrize("plato_type", ["4", "6", "8", "12", "20"])
+def test_plato_is_canonical(plato_type):
+    """
+    the platonic solids are already canonical once scaled
+    """
+    verts, faces = solid(plato_type)
+    verts_canon, res = canon_approx.approx_canonize(verts, faces, solves=0)
+    assert res['tangency'] == pytest.approx(0.0, abs=1e-6)
+    assert res['planarity'] == pytest.approx(0.0, abs=1e-6)
+    assert res['center'] == pytest.approx(0.0, abs=1e-6)
+    assert res == pytest.approx(canon_approx.residuals(verts_canon, faces))
+
+
+@pytest.mark.parametrize("cw_op", [conway.gyro, conway.propellor,
+                                   conway.whirl, conway.chamfer])
+def test_residuals_decrease(cw_op):
+    verts, faces = cw_op(*solid("6"))
+    start = canon_approx.residuals(verts, faces)
+    verts_canon, res = canon_approx.approx_canonize(verts, faces, solves=20)
+    assert len(verts_canon) == len(verts)
+    assert res['tangency'] < start['tangency']
+    assert res['tangency'] < 0.1
+    assert res['planarity'] < 0.1
+
+
+def test_large_mesh_residuals_decrease():
+    """
+    2700 faces, the worst residual goes down as the solves go up
+    """
+    verts, faces = notation.polyhedron("kkkgI")
+    worst = []
+    for solves in (0, 5, 20):
+        verts_canon, res = canon_approx.approx_canonize(verts, faces, solves)
+        assert res == pytest.approx(canon_approx.residuals(verts_canon, faces))
+        worst.append(max(res.values()))
+    assert worst == sorted(worst, reverse=True)
+    assert len(set(worst)) == len(worst)
+    assert worst[-1] < 0.01
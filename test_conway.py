@@ -17,7 +17,7 @@ import pytest
 import mathutils
 import conway
 
-from plato_solid import source as solid
+from seeds import source as solid
 
 # ---- Face and edge functions
 
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_reorder.py
+
+tests for reorder.py
+"""
+import pytest
+import conway
+import notation
+import reorder
+
+from seeds import source as solid
+
+
+def check_orders(verts, faces, verts2, faces2, vert_order, face_order):
+    """
+    the permutations map the new mesh back onto the old one
+    """
+    assert sorted(vert_order) == list(range(len(verts)))
+    assert sorted(face_order) == list(range(len(faces)))
+    for v_new, v_old in enumerate(vert_order):
+        assert verts2[v_new] == verts[v_old]
+    for face_new, face_old in zip(faces2, face_order):
+        face_back = [vert_order[v1] for v1 in face_new]
+        face = faces[face_old]
+        start = face.index(face_back[0])
+        assert face_back == face[start:] + face[:start]
+
+
+@pytest.mark.parametrize("method", ["bfs", "morton"])
+@pytest.mark.parametrize("cw_op", [conway.kis, conway.gyro, conway.whirl])
+def test_reorder_same_mesh(cw_op, method):
+    """
+    the permutations map the new mesh back onto the old one
+    """
+    verts, faces = cw_op(*solid("6"))
+    check_orders(verts, faces, *reorder.reorder_mesh(verts, faces, method))
+
+
+@pytest.mark.parametrize("notation_t", ["k", "gk", "dak"])
+def test_apply_notation_orders(notation_t):
+    """
+    apply_notation_ordered returns the permutations of the output of the
+    last operator
+    """
+    verts, faces = solid("6")
+    verts2, faces2, vert_order, face_order = notation.apply_notation_ordered(
+        notation_t, verts, faces, "bfs")
+    verts_before, faces_before = notation.apply_notation(notation_t[1:], verts,
+                                                         faces, order="bfs")
+    verts_op, faces_op = notation.apply_notation(notation_t[0], verts_before,
+                                                 faces_before)
+    check_orders(verts_op, faces_op, verts2, faces2, vert_order, face_order)
+    assert notation.apply_notation(notation_t, verts, faces,
+                                   order="bfs") == (verts2, faces2)
+
+
+def test_apply_notation_ordered_empty():
+    """
+    with no operator the mesh is not renumbered
+    """
+    verts, faces = solid("6")
+    assert notation.apply_notation_ordered("", verts, faces) == (
+        verts, faces, list(range(len(verts))), list(range(len(faces))))
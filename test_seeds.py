@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_seeds.py
+
+tests for seeds.py
+"""
+import math
+import pytest
+import seeds
+import validate
+
+
+@pytest.mark.parametrize("name, count", [
+    ("T", (4, 6, 4)),
+    ("C", (8, 12, 6)),
+    ("O", (6, 12, 8)),
+    ("D", (20, 30, 12)),
+    ("I", (12, 30, 20)),
+    ("P3", (6, 9, 5)),
+    ("P7", (14, 21, 9)),
+    ("A4", (8, 16, 10)),
+    ("A9", (18, 36, 20)),
+    ("Y4", (5, 8, 5)),
+    ("Y8", (9, 16, 9)),
+])
+def test_seed_valid(name, count):
+    verts, faces = seeds.seed(name)
+    report = validate.check_mesh(verts, faces)
+    assert report['problems'] == []
+    assert (report['verts'], report['edges'], report['faces']) == count
+
+
+@pytest.mark.parametrize("name", ["T", "C", "O", "D", "I", "P5", "A5", "Y5"])
+def test_equal_edges(name):
+    verts, faces = seeds.seed(name)
+    lengths = [math.dist(verts[v1], verts[v2])
+               for face in faces for v1, v2 in zip(face, face[1:] + face[:1])]
+    assert lengths == pytest.approx([lengths[0]] * len(lengths))
+
+
+def test_seed_cached():
+    assert seeds.seed("P6") is seeds.seed("P6")
+    assert seeds.source("6") is not seeds.source("6")
+    assert seeds.source("6") == seeds.seed("C")
+    with pytest.raises(ValueError):
+        seeds.seed("Q3")
+    with pytest.raises(ValueError):
+        seeds.seed("A2")
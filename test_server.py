@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_server.py
+
+tests for server.py, with the server running in a thread
+"""
+import socket
+import struct
+import threading
+import numpy as np
+import pytest
+import notation
+import server
+
+
+@pytest.fixture(scope='module')
+def address(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('sock') / 'conway.sock')
+    srv = server.make_server(path)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield path
+    srv.shutdown()
+    srv.server_close()
+
+
+def faces_from(arrays):
+    ends = np.cumsum(arrays['face_sizes'])
+    return [arrays['face_verts'][end - size:end].tolist()
+            for size, end in zip(arrays['face_sizes'], ends)]
+
+
+def test_batch(address):
+    with server.Client(address) as client:
+        results = client.request([
+            {'notation': 'gkC'},
+            {'notation': 'aP5', 'triangulate': True},
+            {'notation': 'kD', 'params': {'k': {'height': 0.2}}},
+            {'notation': 'xC'},
+        ])
+    verts, faces = notation.polyhedron('gkC')
+    assert results[0]['arrays']['verts'] == pytest.approx(np.array(verts))
+    assert faces_from(results[0]['arrays']) == faces
+    assert len(results[1]['arrays']['tri_face']) == len(results[1]['arrays']['tris'])
+    verts, faces = notation.polyhedron('kD', params={'k': {'height': 0.2}})
+    assert results[2]['arrays']['verts'] == pytest.approx(np.array(verts))
+    assert 'unknown operator' in results[3]['error']
+
+
+def test_canonize(address):
+    with server.Client(address) as client:
+        approx, = client.request([{'notation': 'gC', 'canonize': 'approx',
+                                   'solves': 20}])
+        # a second batch on the same connection is served from the cache
+        again, = client.request([{'notation': 'gC', 'canonize': 'approx',
+                                  'solves': 20}])
+    assert approx['residuals']['tangency'] < 0.05
+    assert again['residuals'] == approx['residuals']
+    assert np.array_equal(again['arrays']['verts'], approx['arrays']['verts'])
+
+
+def test_concurrent_clients(address):
+    results = {}
+
+    def worker(text):
+        with server.Client(address) as client:
+            results[text] = client.request([{'notation': text}])[0]
+
+    texts = ['aC', 'gO', 'wT', 'cI', 'pA4', 'kY5']
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for text in texts:
+        assert len(results[text]['arrays']['verts']) == len(notation.polyhedron(text)[0])
+
+
+def test_cli(address, tmp_path, capsys):
+    out = str(tmp_path / 'out.npz')
+    assert server.main(['run', '--address', address, 'aC', '--out', out]) == 0
+    assert 'aC: 12 verts, 14 faces' in capsys.readouterr().out
+    assert np.load(out)['aC/verts'].shape == (12, 3)
+
+
+def test_make_server_address_in_use(address, tmp_path):
+    # a live server is left alone
+    with pytest.raises(OSError, match='already running'):
+        server.make_server(address)
+    # so is a file that is not a socket
+    path = tmp_path / 'not_a_socket'
+    path.write_text('keep me')
+    with pytest.raises(FileExistsError):
+        server.make_server(str(path))
+    assert path.read_text() == 'keep me'
+    # a socket with no server behind it is replaced
+    stale = str(tmp_path / 'stale.sock')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(stale)
+    sock.close()
+    srv = server.make_server(stale)
+    srv.server_close()
+
+
+def test_bad_requests(address):
+    bad = [
+        ['kC'],
+        {'notation': 'kC', 'params': [1]},
+        {'notation': 'kC', 'params': {'k': {'bogus': 1.0}}},
+        {'notation': 'kC', 'params': {'k': {'height': 'high'}}},
+        {'notation': 'kC', 'canonize': 'exact'},
+        {'notation': 'kC', 'canonize': 'approx', 'solves': -1},
+        {'notation': 3},
+        {'notation': 'kC', 'triangulate': 'yes'},
+        {'notation': 'kC', 'colour': 'red'},
+    ]
+    with server.Client(address) as client:
+        results = client.request(bad + [{'notation': 'kC'}])
+        for result in results[:-1]:
+            assert result['error']
+            assert result['arrays'] == {}
+        assert len(results[-1]['arrays']['verts']) == 14
+
+        # a batch that is not a dict with a list of requests is refused,
+        # and the connection still works after it
+        for message in (b'[1, 2]', b'{"requests": 1}', b'not json', b'\xff'):
+            server.send_frame(client.sock, message)
+            header = server.recv_frame(client.sock)
+            assert server.recv_frame(client.sock) == b''
+            assert 'bad request' in header.decode()
+        assert 'error' not in client.request([{'notation': 'aC'}])[0]
+
+
+def test_cache_keys(monkeypatch):
+    calls = []
+    real_triangulate = server.triangulate.triangulate
+    monkeypatch.setattr(server.triangulate, 'triangulate',
+                        lambda *mesh: calls.append(1) or real_triangulate(*mesh))
+    request = {'notation': 'wkO', 'canonize': 'approx', 'solves': 3,
+               'triangulate': True}
+    arrays = server.evaluate(request)[0]
+    again = server.evaluate(dict(request))[0]
+    assert len(calls) == 1
+    assert again['tris'] is arrays['tris']
+    # the triangles are made from the canonized verts
+    tris, tri_face = real_triangulate(arrays['verts'], faces_from(arrays))
+    assert np.array_equal(arrays['tris'], tris)
+
+    # settings of the other mode do not make a new cache entry
+    size = server._canonize.cache_info().entries
+    server.evaluate(dict(request, iterations=5, scale_factor=0.3))
+    assert server._canonize.cache_info().entries == size
+    assert len(calls) == 1
+    server.evaluate({'notation': 'wkO', 'canonize': 'symmetric',
+                     'iterations': 2, 'solves': 99})
+    server.evaluate({'notation': 'wkO', 'canonize': 'symmetric',
+                     'iterations': 2, 'solves': 7})
+    assert server._canonize.cache_info().entries == size + 1
+
+
+def test_limits(address):
+    with pytest.raises(ValueError, match='localhost'):
+        server.parse_address('0.0.0.0:9000')
+    with pytest.raises(ValueError, match='localhost'):
+        server.parse_address('example.com:9000')
+    assert server.parse_address('localhost:9000')[1] == ('localhost', 9000)
+    assert server.parse_address('127.0.0.2:9000')[1] == ('127.0.0.2', 9000)
+
+    with server.Client(address) as client:
+        results = client.request([
+            {'notation': 'k' * 20 + 'C'},
+            {'notation': 'k' * 12 + 'C'},
+            {'notation': 'd' * (server.MAX_OPERATORS + 1) + 'C'},
+            {'notation': 'P100000'},
+            {'notation': 'gC', 'canonize': 'approx', 'solves': 10 ** 9},
+            {'notation': 'kkkkkkC'},
+        ])
+        for result in results[:-1]:
+            assert result['error']
+        assert len(results[-1]['arrays']['face_sizes']) == 5832
+    # a frame over the limit is refused without reading it
+    with server.Client(address) as client:
+        client.sock.sendall(struct.pack('>I', server.MAX_FRAME + 1))
+        header = server.recv_frame(client.sock)
+        assert 'over the limit' in header.decode()
+
+
+def test_suffix_params_reuse():
+    server.evaluate({'notation': 'gO'})
+    info = server._build.cache_info()
+    server.evaluate({'notation': 'kgO', 'params': {'k': {'height': 0.3}}})
+    # only kgO is new, gO with no params is reused
+    assert server._build.cache_info().misses == info.misses + 1
+
+
+def test_sized_cache():
+    calls = []
+    cache = server._SizedCache(lambda n: calls.append(n) or [0] * n, 10, len)
+    cache(4)
+    cache(4)
+    assert calls == [4]
+    cache(5)
+    assert cache.cache_info().entries == 2
+    # over the size bound the least recently used entry goes
+    cache(3)
+    assert cache.cache_info() == server.CacheInfo(1, 3, 2, 8)
+    cache(4)
+    assert calls == [4, 5, 3, 4]
+    # a value bigger than the whole cache is not kept
+    cache(11)
+    cache(11)
+    assert calls[-2:] == [11, 11]
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_symmetry.py
+
+tests for symmetry.py
+uses standalaone version of mathutils
+https://github.com/majimboo/py-mathutils
+"""
+import pytest
+import mathutils
+import conway
+import symmetry
+
+from seeds import source as solid
+
+
+@pytest.mark.parametrize("plato_type, order", [
+    ("4", 12),
+    ("6", 24),
+    ("8", 24),
+    ("12", 60),
+    ("20", 60),
+])
+def test_group_order(plato_type, order):
+    verts, faces = solid(plato_type)
+    group = symmetry.symmetry_group(verts, faces)
+    assert len(group) == order
+    assert len(symmetry.symmetry_group(verts, faces, reflections=True)) == 2 * order
+    identity = [c for row in group[0] for c in row]
+    assert identity == pytest.approx([1., 0., 0., 0., 1., 0., 0., 0., 1.], abs=1e-6)
+
+
+@pytest.mark.parametrize("cw_op", [conway.kis, conway.ambo, conway.gyro,
+                                   conway.propellor, conway.whirl])
+def test_operator_keeps_rotations(cw_op):
+    verts, faces = solid("6")
+    group = symmetry.symmetry_group(verts, faces)
+    verts2, faces2 = cw_op(verts, faces)
+    perms = symmetry.vert_permutations(verts2, group)
+    reps, vert_orbit = symmetry.orbits(perms)
+    assert sorted(set(rep for rep, g_i in vert_orbit)) == reps
+
+
+def test_canonize_symmetric():
+    """
+    every edge of the canonical form is tangent to the unit sphere
+    """
+    verts, faces = solid("6")
+    group = symmetry.symmetry_group(verts, faces)
+    verts2, faces2 = conway.gyro(verts, faces)
+    verts_canon = symmetry.canonize_symmetric(verts2, faces2, group, 500, 0.2)
+    for face in faces2:
+        for v1, v2 in zip(face, face[1:] + face[:1]):
+            tangent = mathutils.Vector(conway.tangent_point(verts_canon, (v1, v2)))
+            assert tangent.length == pytest.approx(1.0, abs=1e-3)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_topology.py
+
+tests for topology.py and notation.py
+"""
+import random
+import pytest
+import conway
+import notation
+import topology
+
+from seeds import source as solid
+
+
+def shuffle_mesh(faces):
+    """
+    same mesh with the verts renumbered, the faces reordered and each face
+    started at a different vert
+    """
+    nverts = max(v1 for face in faces for v1 in face) + 1
+    new_i = list(range(nverts))
+    random.shuffle(new_i)
+    faces_out = []
+    for face in faces:
+        face = [new_i[v1] for v1 in face]
+        start = random.randrange(len(face))
+        faces_out.append(face[start:] + face[:start])
+    random.shuffle(faces_out)
+    return faces_out
+
+
+@pytest.mark.parametrize("cw_op", [conway.kis, conway.ambo, conway.gyro,
+                                   conway.chamfer, conway.whirl])
+def test_fingerprint_shuffle(cw_op):
+    verts, faces = cw_op(*solid("6"))
+    faces2 = shuffle_mesh(faces)
+    assert topology.fingerprint(faces) == topology.fingerprint(faces2)
+    assert topology.isomorphic(faces, faces2, mirror=False) is not None
+
+
+def test_dual_cube_is_octahedron():
+    faces_dual = conway.dual(*solid("6"))[1]
+    assert topology.isomorphic(faces_dual, solid("8")[1]) is not None
+    assert topology.isomorphic(faces_dual, solid("6")[1]) is None
+
+
+def test_gyro_mirror():
+    """
+    gyro on a cube is chiral, it only matches its mirror image if mirror is
+    allowed
+    """
+    faces_gyro = conway.gyro(*solid("6"))[1]
+    faces_mirror = [face[::-1] for face in faces_gyro]
+    assert topology.isomorphic(faces_gyro, faces_mirror) is not None
+    assert topology.isomorphic(faces_gyro, faces_mirror, mirror=False) is None
+
+
+@pytest.mark.parametrize("notation_t", ["k", "d", "a", "c", "g", "p", "w",
+                                        "gkd", "wac"])
+def test_counts(notation_t):
+    verts, faces = notation.apply_notation(notation_t, *solid("12"))
+    edges = {tuple(sorted(edge)) for face in faces
+             for edge in zip(face, face[1:] + face[:1])}
+    assert notation.counts(notation_t, 20, 30, 12) == (len(verts), len(edges),
+                                                       len(faces))
+
+
+def test_enumerate_notations():
+    unique, same_as = notation.enumerate_notations(*solid("6"), length=2)
+    assert len(same_as) == 1 + 7 + 49
+    assert same_as['dd'] == ''
+    assert same_as['ad'] == 'a'
+    assert same_as['gd'] == 'g'
+    assert set(same_as.values()) == set(unique)
+
+
+@pytest.mark.parametrize("mirror", [True, False])
+def test_enumerate_notations_brute_force(mirror):
+    """
+    every same_as entry at length 3 checked on the actual meshes, this
+    covers the extensions of duplicates, such as "ggd" from "gd" which only
+    matches "g" as a mirror image
+    """
+    seed = solid("6")
+    unique, same_as = notation.enumerate_notations(*seed, length=3,
+                                                   ops='dgpw', mirror=mirror)
+    assert len(same_as) == 1 + 4 + 16 + 64
+    if mirror:
+        assert same_as['gd'] == 'g'
+        assert same_as['ggd'] == 'ggd'
+    for notation_t, match in same_as.items():
+        faces = notation.apply_notation(notation_t, *seed)[1]
+        assert topology.isomorphic(faces, unique[match][1], mirror) is not None
+    by_hash = {}
+    for notation_t, (verts, faces) in unique.items():
+        by_hash.setdefault(topology.fingerprint(faces), []).append(faces)
+    for others in by_hash.values():
+        for i, faces in enumerate(others):
+            for other in others[:i]:
+                assert topology.isomorphic(faces, other, mirror) is None
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_triangulate.py
+
+tests for triangulate.py
+"""
+import numpy as np
+import pytest
+import conway
+import triangulate
+
+from seeds import source as solid
+
+
+def area_vectors(verts, faces):
+    """
+    Newell area vector of each face
+    """
+    verts = np.asarray(verts, dtype=float)
+    return np.array([0.5 * np.cross(verts[face], verts[np.roll(face, -1)]).sum(axis=0)
+                     for face in faces])
+
+
+@pytest.mark.parametrize("cw_op", [conway.kis, conway.ambo, conway.chamfer,
+                                   conway.gyro, conway.propellor, conway.whirl])
+def test_operator_triangles(cw_op):
+    verts, faces = cw_op(*solid("12"))
+    tris, tri_face = triangulate.triangulate(verts, faces)
+    assert len(tris) == sum(len(face) - 2 for face in faces)
+    assert np.bincount(tri_face).tolist() == [len(face) - 2 for face in faces]
+    assert (np.diff(tri_face) >= 0).all()
+    # all verts of each triangle come from its face
+    for tri, face_i in zip(tris, tri_face):
+        assert set(tri) <= set(faces[face_i])
+
+
+def test_planar_area():
+    """
+    for flat faces the triangles cover the face exactly, with the same normal
+    """
+    verts, faces = conway.ambo(*solid("6"))
+    tris, tri_face = triangulate.triangulate(verts, faces)
+    tri_area = area_vectors(verts, tris)
+    face_area = np.array([tri_area[tri_face == face_i].sum(axis=0)
+                          for face_i in range(len(faces))])
+    assert face_area == pytest.approx(area_vectors(verts, faces))
+
+
+def test_reflex_face():
+    """
+    an L shaped face is ear clipped, not fanned across the notch
+    """
+    verts = [[0, 0, 0], [2, 0, 0], [2, 1, 0], [1, 1, 0], [1, 2, 0], [0, 2, 0]]
+    faces = [[1, 2, 3, 4, 5, 0]]
+    tris, tri_face = triangulate.triangulate(verts, faces)
+    areas = area_vectors(verts, tris)
+    assert len(tris) == 4
+    assert (areas[:, 2] > 0).all()
+    assert areas[:, 2].sum() == pytest.approx(3.0)
+
+
+def test_same_for_copies():
+    """
+    the result depends only on the values of the verts and faces
+    """
+    verts, faces = conway.gyro(*solid("6"))
+    tris, tri_face = triangulate.triangulate(verts, faces)
+    tris2, tri_face2 = triangulate.triangulate([v[:] for v in verts],
+                                               [face[:] for face in faces])
+    assert np.array_equal(tris, tris2)
+    assert np.array_equal(tri_face, tri_face2)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+test_validate.py
+
+tests for validate.py
+"""
+import numpy as np
+import pytest
+import conway
+import mesh
+import validate
+
+from seeds import source as solid
+
+
+@pytest.mark.parametrize("cw_op", [conway.kis, conway.dual, conway.ambo,
+                                   conway.chamfer, conway.gyro,
+                                   conway.propellor, conway.whirl])
+@pytest.mark.parametrize("sample", [None, 5])
+def test_operator_valid(cw_op, sample):
+    verts, faces = cw_op(*solid("6"))
+    report = validate.check_mesh(verts, faces, sample=sample, seed=1)
+    assert report['problems'] == []
+    assert report['euler'] == 2
+    assert (report['parts'] == 1) == (sample is None)
+
+
+def test_corners():
+    faces = [[0, 1, 2], [3, 4, 5, 6], [7, 8, 9]]
+    corner_face, corner_vert, corner_next = mesh.corners(faces)
+    assert corner_face.tolist() == [0, 0, 0, 1, 1, 1, 1, 2, 2, 2]
+    assert corner_vert.tolist() == list(range(10))
+    assert corner_next.tolist() == [1, 2, 0, 4, 5, 6, 3, 8, 9, 7]
+    arr_face, arr_vert, arr_next = mesh.corners(np.array(solid("6")[1]))
+    assert arr_next.tolist() == mesh.corners(solid("6")[1])[2].tolist()
+
+
+def test_sample_counts():
+    verts, faces = conway.whirl(*solid("12"))
+    full = validate.check_mesh(verts, faces)
+    sampled = validate.check_mesh(verts, faces, sample=10, seed=3)
+    assert isinstance(full['edges'], int)
+    assert sampled['edges'] == full['edges']
+    assert sampled['euler'] == full['euler'] == 2
+
+
+def test_array_faces():
+    verts, faces = solid("6")
+    report = validate.check_mesh(np.array(verts), np.array(faces))
+    assert report['problems'] == []
+    assert (report['verts'], report['edges'], report['faces']) == (8, 12, 6)
+
+
+def test_flipped_face():
+    verts, faces = solid("6")
+    faces = [face[:] for face in faces]
+    faces[0].reverse()
+    problems = validate.check_mesh(verts, faces)['problems']
+    assert any('twin' in problem for problem in problems)
+
+
+def test_inward_faces():
+    verts, faces = solid("8")
+    faces = [face[::-1] for face in faces]
+    problems = validate.check_mesh(verts, faces)['problems']
+    assert problems == ['faces are clockwise, normals point inwards']
+
+
+def test_two_parts_and_hole():
+    verts, faces = solid("4")
+    verts2 = verts + [[x + 5, y, z] for x, y, z in verts]
+    faces2 = faces + [[v1 + 4 for v1 in face] for face in faces]
+    report = validate.check_mesh(verts2, faces2, euler=4, parts=2)
+    assert report['problems'] == []
+    report = validate.check_mesh(verts, faces[1:])
+    assert len(report['problems']) == 2
+    # the edges of the hole are still counted
+    assert (report['verts'], report['edges'], report['faces']) == (4, 6, 3)
+    assert report['euler'] == 1
+
+
+def test_degenerate_face():
+    verts = [[0., 0., 0.], [1., 0., 0.], [2., 0., 0.], [0., 1., 0.]]
+    faces = [[0, 1, 2], [0, 2, 1, 1]]
+    problems = validate.check_mesh(verts, faces, euler=None, parts=None)['problems']
+    assert any('zero area' in problem for problem in problems)
+    assert any('repeated' in problem for problem in problems)
@@ -0,0 +1,144 @@
+"""
+functions to compare the topology (connectivity) of polyhedra
+
+fingerprint gives a hash of the face/vertex incidence of a mesh that is the
+same for any two meshes with the same topology, whatever the order of their
+faces and verts.  Different topologies almost always give different hashes,
+isomorphic confirms a match exactly.
+
+Only the faces are used, the vertex coordinates are ignored.
+"""
+from collections import Counter
+import hashlib
+
+
+def _incidence(faces):
+    """
+    neighbours of each vert and face in the vert-face incidence graph
+    verts are nodes 0..nverts-1, faces follow after them
+    """
+    nverts = max(v1 for face in faces for v1 in face) + 1
+    nbrs = [[] for v1 in range(nverts + len(faces))]
+    for face_i, face in enumerate(faces):
+        for v1 in face:
+            nbrs[v1].append(nverts + face_i)
+            nbrs[nverts + face_i].append(v1)
+    return nverts, nbrs
+
+
+def fingerprint(faces, rounds=3):
+    """
+    Weisfeiler-Lehman hash of the vert-face incidence graph of faces
+    inputs:
+    faces: list of indcies of verts in each face
+    rounds: number of refinement rounds, each one takes in neighbours
+            one step further away
+    output:
+    hex digest string, equal for isomorphic meshes (and for mirror images)
+    """
+    nverts, nbrs = _incidence(faces)
+    # start with verts and faces kept apart and colored by their degree
+    colors = [(node < nverts, len(nbr)) for node, nbr in enumerate(nbrs)]
+    colors = [hash(color) for color in colors]
+    for i in range(rounds):
+        colors = [hash((colors[node], tuple(sorted(colors[n] for n in nbr))))
+                  for node, nbr in enumerate(nbrs)]
+    counts = sorted(Counter(colors).items())
+    return hashlib.sha1(repr((nverts, len(faces), counts)).encode()).hexdigest()
+
+
+def _next_half_edge(faces):
+    """
+    dict from half-edge (v1, v2) to the next CCW half-edge (v2, v3) in its face
+    """
+    nxt = {}
+    for face in faces:
+        for v1, v2, v3 in zip(face, face[1:] + face[:1], face[2:] + face[:2]):
+            nxt[(v1, v2)] = (v2, v3)
+    return nxt
+
+
+def _half_edge_key(nxt, he):
+    """
+    (face size, vertex degree) of the face and tail vert of a half-edge
+    """
+    size = 1
+    he_n = nxt[he]
+    while he_n != he:
+        size += 1
+        he_n = nxt[he_n]
+    # walk around the tail vertex: twin then next
+    degree = 1
+    he_n = nxt[(he[1], he[0])]
+    while he_n != he:
+        degree += 1
+        he_n = nxt[(he_n[1], he_n[0])]
+    return size, degree
+
+
+def _extend(nxt_a, nxt_b, he_a, he_b):
+    """
+    try to extend the map he_a -> he_b to the whole mesh by following
+    next and twin half-edges.  Returns the map or None if it fails.
+    """
+    he_map = {he_a: he_b}
+    used = {he_b}
+    stack = [he_a]
+    while stack:
+        he1 = stack.pop()
+        he2 = he_map[he1]
+        for step in (lambda he, nxt: nxt[he],
+                     lambda he, nxt: (he[1], he[0])):
+            he1_n = step(he1, nxt_a)
+            he2_n = step(he2, nxt_b)
+            if he2_n not in nxt_b:
+                return None
+            if he1_n in he_map:
+                if he_map[he1_n] != he2_n:
+                    return None
+            else:
+                if he2_n in used:
+                    return None
+                he_map[he1_n] = he2_n
+                used.add(he2_n)
+                stack.append(he1_n)
+    if len(he_map) != len(nxt_a):
+        return None
+    return he_map
+
+
+def isomorphic(faces_a, faces_b, mirror=True):
+    """
+    exact test for two closed connected meshes having the same topology
+    inputs:
+    faces_a, faces_b: list of indcies of verts in each face
+    mirror: also accept a match with the orientation of faces_b reversed,
+            as for the left and right handed forms from gyro
+    output:
+    vert_map: dict from vert index in faces_a to vert index in faces_b,
+              or None if not isomorphic
+
+    One half-edge of faces_a is tried against every half-edge of faces_b with
+    the same face size and vertex degree; the map then follows from the
+    next and twin half-edges.
+    """
+    if len(faces_a) != len(faces_b):
+        return None
+    nxt_a = _next_half_edge(faces_a)
+    if len(nxt_a) != sum(len(face) for face in faces_b):
+        return None
+
+    he_a = min(nxt_a)
+    key_a = _half_edge_key(nxt_a, he_a)
+    faces_bs = [faces_b]
+    if mirror:
+        faces_bs.append([face[::-1] for face in faces_b])
+    for faces in faces_bs:
+        nxt_b = _next_half_edge(faces)
+        for he_b in nxt_b:
+            if _half_edge_key(nxt_b, he_b) != key_a:
+                continue
+            he_map = _extend(nxt_a, nxt_b, he_a, he_b)
+            if he_map is not None:
+                return {he1[0]: he2[0] for he1, he2 in he_map.items()}
+    return None
@@ -0,0 +1,127 @@
+"""
+split the faces of a mesh into triangles for drawing and export
+
+gyro, whirl, propellor and chamfer make pentagons and hexagons that are not
+flat until canonized, and Blender and GL split every n-gon again each time
+they are drawn.  triangulate does it once for the whole mesh:
+convex faces are fanned from their first vert with numpy in one pass, only
+faces with a reflex corner are ear clipped one at a time.
+
+Each triangle keeps the CCW order of its face, and tri_face maps it back to
+the face it came from.  Keep the result with the mesh it was made from
+(as server.py and snl_triangulate.py do) rather than triangulating again.
+"""
+import numpy as np
+from mesh import mesh_arrays
+
+
+def _corner_index(corner_face, nfaces):
+    """
+    first corner of each face and the position of each corner in its face
+    """
+    sizes = np.bincount(corner_face, minlength=nfaces)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    local = np.arange(len(corner_face)) - starts[corner_face]
+    return sizes, starts, local
+
+
+def _reflex_faces(verts, corner_face, corner_vert, corner_next, nfaces,
+                  sizes, starts, local):
+    """
+    boolean array, True for faces with a corner that turns clockwise about
+    the face normal
+    """
+    prev_i = np.where(local == 0, starts[corner_face] + sizes[corner_face] - 1,
+                      np.arange(len(corner_face)) - 1)
+    corner_prev = corner_vert[prev_i]
+    cross = np.cross(verts[corner_vert], verts[corner_next])
+    norms = np.stack([np.bincount(corner_face, cross[:, i], minlength=nfaces)
+                      for i in range(3)], axis=1)
+    turn = np.cross(verts[corner_vert] - verts[corner_prev],
+                    verts[corner_next] - verts[corner_vert])
+    turn = np.einsum('ij,ij->i', turn, norms[corner_face])
+    scale = np.einsum('ij,ij->i', norms, norms)[corner_face]
+    reflex = turn < -1e-12 * scale
+    return np.bincount(corner_face, reflex, minlength=nfaces) > 0
+
+
+def _ear_clip(verts, face):
+    """
+    triangles of one face by ear clipping in the plane of its normal
+    """
+    pts = verts[face]
+    norm = np.cross(pts, np.roll(pts, -1, axis=0)).sum(axis=0)
+    axis_u = pts[1] - pts[0]
+    axis_u = axis_u - axis_u.dot(norm) / norm.dot(norm) * norm
+    axis_v = np.cross(norm, axis_u)
+    pts = np.stack((pts @ axis_u, pts @ axis_v), axis=1)
+
+    def area2(a, b, c):
+        return ((pts[b, 0] - pts[a, 0]) * (pts[c, 1] - pts[a, 1]) -
+                (pts[b, 1] - pts[a, 1]) * (pts[c, 0] - pts[a, 0]))
+
+    remain = list(range(len(face)))
+    tris = []
+    while len(remain) > 3:
+        for k in range(len(remain)):
+            a, b, c = remain[k - 1], remain[k], remain[(k + 1) % len(remain)]
+            if area2(a, b, c) <= 0:
+                continue
+            # no other vert inside the ear
+            if any(area2(a, b, p) >= 0 and area2(b, c, p) >= 0 and
+                   area2(c, a, p) >= 0
+                   for p in remain if p not in (a, b, c)):
+                continue
+            tris.append((face[a], face[b], face[c]))
+            del remain[k]
+            break
+        else:
+            # no ear found, the face is too badly bent so fan the rest
+            break
+    for k in range(1, len(remain) - 1):
+        tris.append((face[remain[0]], face[remain[k]], face[remain[k + 1]]))
+    return tris
+
+
+def triangulate(verts, faces):
+    """
+    split every face into triangles
+    inputs:
+    verts: list or array of x, y, z coords of verticies
+    faces: list of indcies of verts in each face, or (nfaces, n) array
+    output:
+    tris: (ntris, 3) int array of vert indices, CCW like their faces
+    tri_face: (ntris,) int array, the face index of each triangle,
+              triangles of the same face are together and in face order
+    """
+    verts = np.asarray(verts, dtype=float)
+    nfaces = len(faces)
+    corner_face, corner_vert, corner_next, _edges = mesh_arrays(faces)
+    sizes, starts, local = _corner_index(corner_face, nfaces)
+
+    # fan from the first vert of each face: one triangle per corner
+    # except the first and last
+    fan = (local >= 1) & (local <= sizes[corner_face] - 2)
+    reflex = _reflex_faces(verts, corner_face, corner_vert, corner_next,
+                           nfaces, sizes, starts, local)
+    fan &= ~reflex[corner_face]
+    tris = np.stack((corner_vert[starts[corner_face]], corner_vert,
+                     corner_next), axis=1)[fan]
+    tri_face = corner_face[fan]
+
+    reflex_i = np.flatnonzero(reflex)
+    if len(reflex_i):
+        clip_tris = []
+        clip_face = []
+        for face_i in reflex_i:
+            face = corner_vert[starts[face_i]:starts[face_i] + sizes[face_i]]
+            face_tris = _ear_clip(verts, face)
+            clip_tris.extend(face_tris)
+            clip_face.extend([face_i] * len(face_tris))
+        tris = np.concatenate((tris, np.array(clip_tris, dtype=int)))
+        tri_face = np.concatenate((tri_face, np.array(clip_face, dtype=int)))
+        order = np.argsort(tri_face, kind='stable')
+        tris = tris[order]
+        tri_face = tri_face[order]
+    return tris, tri_face
+
@@ -0,0 +1,165 @@
+"""
+checks that a mesh is a closed, consistently oriented polyhedron
+
+These are the checks from check_mesh and part_count in test_conway.py done
+with numpy over the whole mesh at once, so they are cheap enough to run on
+every polyhedron a pipeline makes.
+
+check_mesh has a full mode and a sampled mode.  The sampled mode only looks
+at the half-edges of a random sample of faces and skips the whole mesh
+checks (unused verts, connected parts, orientation of the whole surface),
+for use when the full checks still cost too much.
+"""
+import numpy as np
+from mesh import corners
+
+
+def _parts(nverts, corner_vert, corner_next, used):
+    """
+    number of connected parts, by propagating the lowest vert index along
+    the half-edges until nothing changes
+    """
+    labels = np.arange(nverts)
+    while True:
+        old = labels.copy()
+        np.minimum.at(labels, corner_vert, labels[corner_next])
+        np.minimum.at(labels, corner_next, labels[corner_vert])
+        labels = labels[labels]
+        if np.array_equal(labels, old):
+            break
+    return len(np.unique(labels[used]))
+
+
+def _signed_volume(verts, corner_face, corner_vert, corner_next, nfaces):
+    """
+    volume enclosed by the faces, negative if they face inwards
+    exact for planar faces
+    """
+    cross = np.cross(verts[corner_vert], verts[corner_next])
+    counts = np.bincount(corner_face, minlength=nfaces)
+    centers = np.stack([np.bincount(corner_face, verts[corner_vert, i],
+                                    minlength=nfaces) for i in range(3)],
+                       axis=1) / counts[:, None]
+    return np.einsum('ij,ij->', cross, centers[corner_face]) / 6.0
+
+
+def check_mesh(verts, faces, sample=None, seed=None, euler=2, parts=1,
+               tol=1e-12):
+    """
+    check verts and faces form a closed manifold mesh
+    inputs:
+    verts: list or (n, 3) array of x, y, z coords of verticies
+    faces: list of indcies of verts in each face, or (nfaces, n) array
+    sample: if given, only check the half-edges of this many random faces
+    seed: random seed for the sample
+    euler: expected V - E + F, None to skip (2 for each sphere-like part)
+    parts: expected number of connected parts, None to skip (full mode only)
+    tol: smallest face area that is not degenerate
+    output:
+    report: dict of
+        verts, edges, faces: counts, in sampled mode edges assumes the
+                             mesh is closed (half the half-edges)
+        euler: V - E + F
+        parts: number of connected parts, None in sampled mode
+        problems: list of strings describing each failed check,
+                  empty if the mesh passed
+    """
+    verts = np.asarray(verts, dtype=float)
+    nverts = len(verts)
+    nfaces = len(faces)
+    corner_face, corner_vert, corner_next = corners(faces)
+    problems = []
+    report = {'verts': nverts, 'edges': len(corner_vert) // 2, 'faces': nfaces,
+              'euler': None, 'parts': None, 'problems': problems}
+
+    if verts.ndim != 2 or verts.shape[1] != 3:
+        problems.append('verts do not have 3 coords each')
+        return report
+    if len(corner_vert) and (corner_vert.min() < 0 or corner_vert.max() >= nverts):
+        problems.append('face vert index out of range')
+        return report
+
+    # corners to check, all of them or those of a sample of faces
+    if sample is None or sample >= nfaces:
+        sample = None
+        checked = np.ones(len(corner_vert), dtype=bool)
+    else:
+        rng = np.random.default_rng(seed)
+        face_mask = np.zeros(nfaces, dtype=bool)
+        face_mask[rng.choice(nfaces, sample, replace=False)] = True
+        checked = face_mask[corner_face]
+    c_face = corner_face[checked]
+    c_vert = corner_vert[checked]
+    c_next = corner_next[checked]
+
+    # degenerate faces
+    sizes = np.bincount(corner_face, minlength=nfaces)
+    if sample is None:
+        face_ids = np.arange(nfaces)
+    else:
+        face_ids = np.flatnonzero(face_mask)
+    if (sizes[face_ids] < 3).any():
+        problems.append('{} faces with fewer than 3 verts'.format(
+            int((sizes[face_ids] < 3).sum())))
+    face_vert = np.unique(c_face * nverts + c_vert)
+    if len(face_vert) < len(c_vert):
+        problems.append('{} repeated verts within faces'.format(
+            len(c_vert) - len(face_vert)))
+    cross = np.cross(verts[c_vert], verts[c_next])
+    area = np.stack([np.bincount(c_face, cross[:, i], minlength=nfaces)
+                     for i in range(3)], axis=1)[face_ids]
+    area = 0.5 * np.linalg.norm(area, axis=1)
+    if (area <= tol).any():
+        problems.append('{} faces with zero area'.format(int((area <= tol).sum())))
+
+    # each half-edge (v1, v2) must appear once and have one twin (v2, v1)
+    half_edges = corner_vert * nverts + corner_next
+    he = c_vert * nverts + c_next
+    twin = c_next * nverts + c_vert
+    if sample is None:
+        found = np.sort(half_edges)
+        counts = None
+    else:
+        # only count the half-edges the sample needs, a search of every
+        # half-edge into this short list instead of sorting them all
+        found = np.unique(np.concatenate((he, twin)))
+        pos = np.minimum(np.searchsorted(found, half_edges), len(found) - 1)
+        hit = found[pos] == half_edges
+        counts = np.bincount(pos[hit], minlength=len(found))
+
+    def count_of(keys):
+        if counts is None:
+            return (np.searchsorted(found, keys, side='right') -
+                    np.searchsorted(found, keys, side='left'))
+        return counts[np.searchsorted(found, keys)]
+
+    count = count_of(he)
+    if (count > 1).any():
+        problems.append('{} half-edges in more than one face, faces are not '
+                        'consistently oriented or an edge is not '
+                        'manifold'.format(int((count > 1).sum())))
+    boundary = int((count_of(twin) == 0).sum())
+    if boundary:
+        problems.append('{} half-edges with no twin, the mesh has holes or '
+                        'flipped faces'.format(boundary))
+
+    # an edge with no twin is still an edge
+    if sample is None:
+        report['edges'] = (len(corner_vert) + boundary) // 2
+    report['euler'] = nverts - report['edges'] + nfaces
+    if euler is not None and report['euler'] != euler:
+        problems.append('V - E + F is {} not {}'.format(report['euler'], euler))
+
+    if sample is not None:
+        return report
+
+    # whole mesh checks
+    used = np.bincount(corner_vert, minlength=nverts) > 0
+    if not used.all():
+        problems.append('{} verts not in any face'.format(int((~used).sum())))
+    report['parts'] = _parts(nverts, corner_vert, corner_next, used)
+    if parts is not None and report['parts'] != parts:
+        problems.append('{} connected parts not {}'.format(report['parts'], parts))
+    if _signed_volume(verts, corner_face, corner_vert, corner_next, nfaces) < 0:
+        problems.append('faces are clockwise, normals point inwards')
+    return report